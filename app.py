@@ -1,19 +1,42 @@
+import os
+import sys
 import streamlit as st
 import pandas as pd
 import ast
 import plotly.express as px
 
+# Make the Scrapy project package importable for its search index helpers.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "chunkgg"))
+from chunkgg.rollups import open_rollups
+from chunkgg.search import open_index
+from chunkgg.snapshots import row_key
+from chunkgg.timeseries import DAY_SECONDS, TimeSeriesStore
+
+DATA_PATH = "chunkgg/products.csv"  # Update path if needed
+TIMESERIES_PATH = "chunkgg/timeseries.json.gz"
+
 # --- Page config ---
 st.set_page_config(page_title="Minecraft Marketplace Analytics", layout="wide")
 
 # --- Load and preprocess data ---
 @st.cache_data
-def load_data():
-    df = pd.read_csv("chunkgg/products.csv")  # Update path if needed
+def load_data(mtime):
+    # mtime is only part of the cache key so every view reads the same export
+    df = pd.read_csv(DATA_PATH)
 
     # Normalize column names
     df.columns = df.columns.str.lower().str.strip().str.replace(' ', '_')
 
+    # Crawler exports name these title/creator
+    if 'product_name' not in df.columns and 'title' in df.columns:
+        df['product_name'] = df['title']
+    if 'publisher' not in df.columns and 'creator' in df.columns:
+        df['publisher'] = df['creator']
+
+    # Same key the search index uses
+    records = df.astype(object).where(df.notna(), None).to_dict('records')
+    df['doc_key'] = [row_key(row) for row in records]
+
     # Ensure key columns exist
     required_cols = ['downloads', 'prices', 'product_name', 'publisher', 'tags']
     for col in required_cols:
@@ -26,13 +49,37 @@ def load_data():
     # Convert prices column (stringified dict) to dictionary
     df['price_map'] = df['prices'].apply(lambda s: ast.literal_eval(s) if pd.notnull(s) else {})
 
+    # Crawler exports carry separate USD/EUR columns instead
+    for col, code in (('price_usd', 'USD'), ('price_eur', 'EUR')):
+        if col in df.columns:
+            df['price_map'] = [
+                {**pmap, code: value} if pd.notnull(value) and code not in pmap else pmap
+                for pmap, value in zip(df['price_map'], df[col])
+            ]
+
     # Process tags into list
     df['tags_list'] = df['tags'].fillna('').apply(lambda s: [t.strip() for t in s.split(',') if t.strip()])
 
     return df
 
+@st.cache_resource
+def load_search_index(mtime):
+    # mtime is only part of the cache key so a fresh export refreshes the index
+    return open_index(DATA_PATH)
+
+@st.cache_resource
+def load_rollups(mtime):
+    return open_rollups(DATA_PATH)
+
+@st.cache_resource
+def load_timeseries(mtime):
+    return TimeSeriesStore.open(TIMESERIES_PATH)
+
 # Load data
-df = load_data()
+data_mtime = os.path.getmtime(DATA_PATH)
+df = load_data(data_mtime)
+search_index = load_search_index(data_mtime)
+rollups = load_rollups(data_mtime)
 
 # --- Sidebar filters ---
 publishers = st.sidebar.multiselect(
@@ -44,12 +91,18 @@ publishers = st.sidebar.multiselect(
 all_tags = sorted({tag for tags in df['tags_list'] for tag in tags})
 selected_tags = st.sidebar.multiselect("Tags", options=all_tags)
 
+query = st.sidebar.text_input("Search titles, descriptions, tags, changelogs")
+
 currency = st.sidebar.selectbox("Currency", ["USD", "EUR", "GBP", "CAD", "AUD"])
 
 # --- Filter data based on selections ---
 d = df[df['publisher'].isin(publishers)]
 if selected_tags:
     d = d[d['tags_list'].apply(lambda tags: any(t in tags for t in selected_tags))]
+if query:
+    hits = dict(search_index.search(query, limit=len(df)))
+    d = d[d['doc_key'].isin(hits)]
+    d = d.assign(search_score=d['doc_key'].map(hits)).sort_values('search_score', ascending=False)
 
 # --- Currency conversion ---
 rates = {'USD': 1.0, 'EUR': 1.09, 'GBP': 1.27, 'CAD': 0.74, 'AUD': 0.66}
@@ -74,14 +127,35 @@ d[f'revenue_{currency}'] = d[f'revenue_{currency}'].fillna(0)
 d[f'price_{currency}'] = d[f'price_{currency}'].fillna(0)
 
 # --- KPIs ---
+# Rollups are keyed by creator, so they answer publisher-only filters; tag and
+# search filters can overlap and fall back to the filtered rows.
+if not selected_tags and not query:
+    if set(publishers) == set(df['publisher'].unique()):
+        totals = rollups.group("all")
+        top_creators = None
+    else:
+        totals = rollups.combined("creator", publishers)
+        top_creators = publishers
+    total_downloads = totals['downloads']
+    total_revenue = totals['revenue_usd'] / rates[currency]
+    product_count = totals['products']
+    top = pd.DataFrame(rollups.top_products(10, creators=top_creators), columns=["title", "creator", "downloads", "price_usd", "revenue_usd"])
+    top = top.rename(columns={"title": "product_name", "creator": "publisher"})
+    top[f'price_{currency}'] = top['price_usd'].fillna(0) / rates[currency]
+    top[f'revenue_{currency}'] = top['revenue_usd'] / rates[currency]
+else:
+    total_downloads = d['downloads'].sum()
+    total_revenue = d[f'revenue_{currency}'].sum()
+    product_count = len(d)
+    top = d.sort_values(f'revenue_{currency}', ascending=False).head(10)
+
 c1, c2, c3 = st.columns(3)
-c1.metric("Total Downloads", f"{d['downloads'].sum():,}")
-c2.metric(f"Total Revenue ({currency})", f"{d[f'revenue_{currency}'].sum():,.2f}")
-c3.metric("Number of Products", f"{len(d)}")
+c1.metric("Total Downloads", f"{total_downloads:,}")
+c2.metric(f"Total Revenue ({currency})", f"{total_revenue:,.2f}")
+c3.metric("Number of Products", f"{product_count}")
 
 # --- Top Products by Revenue ---
 st.subheader("Top Products by Revenue")
-top = d.sort_values(f'revenue_{currency}', ascending=False).head(10)
 fig = px.bar(
     top,
     x="product_name",
@@ -104,6 +178,26 @@ fig2 = px.scatter(
 )
 st.plotly_chart(fig2, use_container_width=True)
 
+# --- Rating Velocity ---
+if os.path.exists(TIMESERIES_PATH):
+    st.subheader("Rating Velocity")
+    store = load_timeseries(os.path.getmtime(TIMESERIES_PATH))
+    window = st.slider("Window (days)", min_value=1, max_value=90, value=7)
+    end = max((s.last_time for s in store.series.values() if len(s)), default=0)
+    names = df.set_index('doc_key')['product_name'].to_dict()
+    fast = pd.DataFrame(
+        [
+            {"uuid": uuid, "product_name": names.get(uuid, uuid), "ratings_per_day": rate}
+            for uuid, rate in store.top_velocity(10, start=end - window * DAY_SECONDS, end=end)
+        ]
+    )
+    if not fast.empty:
+        st.dataframe(fast[["product_name", "ratings_per_day"]])
+        picked = st.selectbox("Trend", options=fast['uuid'], format_func=lambda u: names.get(u, u))
+        trend = pd.DataFrame(store.downsample(picked, "rating_count"), columns=["day", "rating_count"])
+        trend['day'] = pd.to_datetime(trend['day'], unit='s')
+        st.plotly_chart(px.line(trend, x="day", y="rating_count"), use_container_width=True)
+
 # --- Filtered Data Table ---
 st.subheader("Filtered Products Table")
 st.dataframe(d[["product_name", "publisher", "downloads", f'price_{currency}', f'revenue_{currency}']])
@@ -0,0 +1,299 @@
+"""Read-only JSON API over the latest crawl export.
+
+The export is loaded once into a :class:`ProductCatalog` with indexes on
+``uuid``, ``creator_slug/product_slug``, ``product_slug``, ``creator_slug``, ``category`` and tag. The
+server re-checks the file's modification time at most every
+``poll_interval`` seconds and swaps in a freshly built catalog when a new
+crawl lands and the file has stayed unchanged for one more poll. Responses carry an ETag derived from the catalog version, are
+cached per URL until the next reload, and conditional requests get a 304.
+
+Endpoints::
+
+    GET /health
+    GET /products/<uuid>
+    GET /products/by-slug/<creator_slug>/<product_slug>
+    GET /products/by-slug/<product_slug>        (every creator's product with that slug)
+    GET /products?creator=&category=&tag=&page=1&per_page=50
+    GET /top?by=rating_count&n=10[&creator=&category=&tag=]
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+from chunkgg.items import RATING_STARS
+from chunkgg.snapshots import as_list, iter_rows, to_float, to_int
+
+INT_FIELDS = frozenset(
+    ["price_minecoins", "rating_count", "rating_out_of", "downloads", "skin_count", "trailer_views", "trailer_likes"]
+    + [f"rating_{star}_{kind}" for star in RATING_STARS for kind in ("count", "percent")]
+)
+FLOAT_FIELDS = frozenset(["price_usd", "price_eur", "rating_value"])
+BOOL_FIELDS = frozenset(["is_free", "has_trailer", "supports_singleplayer", "supports_multiplayer", "listing_only"])
+MAX_PER_PAGE = 500
+
+
+def _normalize(row: dict) -> dict:
+    product = {}
+    for key, value in row.items():
+        if key in INT_FIELDS:
+            value = to_int(value)
+        elif key in FLOAT_FIELDS:
+            value = to_float(value)
+        elif key in BOOL_FIELDS and isinstance(value, str):
+            value = value.lower() == "true"
+        product[key] = value
+    return product
+
+
+class ProductCatalog:
+    """One export held in memory with secondary indexes (lists of row positions)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        stat = os.stat(path)
+        self.mtime = stat.st_mtime
+        self.version = hashlib.sha1(f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()[:16]
+        self.products: List[dict] = [_normalize(row) for row in iter_rows(path)]
+        self.by_uuid: Dict[str, int] = {}
+        self.by_slug: Dict[str, int] = {}
+        self.by_product_slug: Dict[str, List[int]] = defaultdict(list)
+        self.by_creator: Dict[str, List[int]] = defaultdict(list)
+        self.by_category: Dict[str, List[int]] = defaultdict(list)
+        self.by_tag: Dict[str, List[int]] = defaultdict(list)
+        for position, product in enumerate(self.products):
+            uuid = product.get("uuid") or product.get("uid")
+            if uuid:
+                self.by_uuid[uuid] = position
+            if product.get("product_slug"):
+                # Product slugs are only unique per creator.
+                self.by_slug[f"{product.get('creator_slug') or ''}/{product['product_slug']}"] = position
+                self.by_product_slug[product["product_slug"]].append(position)
+            if product.get("creator_slug"):
+                self.by_creator[product["creator_slug"]].append(position)
+            if product.get("category"):
+                self.by_category[product["category"].lower()].append(position)
+            for tag in as_list(product.get("tags")):
+                self.by_tag[tag.lower()].append(position)
+        self._rankings: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def select(self, creator=None, category=None, tag=None) -> List[int]:
+        """Row positions matching every given filter, in export order."""
+        candidates = []
+        if creator:
+            candidates.append(self.by_creator.get(creator, []))
+        if category:
+            candidates.append(self.by_category.get(category.lower(), []))
+        if tag:
+            candidates.append(self.by_tag.get(tag.lower(), []))
+        if not candidates:
+            return list(range(len(self.products)))
+        candidates.sort(key=len)
+        selected = candidates[0]
+        for other in candidates[1:]:
+            allowed = set(other)
+            selected = [position for position in selected if position in allowed]
+        return selected
+
+    def ranking(self, field: str) -> List[int]:
+        """Row positions sorted by ``field`` descending (empty values last), built once per field."""
+        with self._lock:
+            order = self._rankings.get(field)
+            if order is None:
+                present = [p for p, product in enumerate(self.products) if product.get(field) is not None]
+                present.sort(key=lambda p: self.products[p][field], reverse=True)
+                order = self._rankings[field] = present
+            return order
+
+
+class CatalogHolder:
+    """Hands out the current catalog, rebuilding it when the export file changes."""
+
+    def __init__(self, path: str, poll_interval: float = 2.0, cache_size: int = 1024):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.cache_size = cache_size
+        self.catalog = ProductCatalog(path)
+        self.cache: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._pending: Optional[Tuple[float, int]] = None
+        self._checked = time.monotonic()
+        self._lock = threading.Lock()
+
+    def current(self) -> ProductCatalog:
+        now = time.monotonic()
+        if now - self._checked >= self.poll_interval:
+            with self._lock:
+                if now - self._checked >= self.poll_interval:
+                    self._checked = now
+                    self._reload_if_changed()
+        return self.catalog
+
+    def _reload_if_changed(self):
+        """Swap in a new catalog once the export has stopped changing.
+
+        A changed (mtime, size) is only remembered on the first poll; the
+        reload happens when the next poll sees the same pair, so a feed that
+        is still being appended to is never loaded half-written.
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return
+        signature = (stat.st_mtime, stat.st_size)
+        if stat.st_mtime == self.catalog.mtime:
+            self._pending = None
+            return
+        if signature != self._pending:
+            self._pending = signature
+            return
+        try:
+            catalog = ProductCatalog(self.path)
+        except Exception:
+            # Unreadable export; keep serving the old catalog and retry later.
+            return
+        self._pending = None
+        self.catalog = catalog
+        self.cache = OrderedDict()
+
+    def cached(self, key: str) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                self.cache.move_to_end(key)
+            return entry
+
+    def store(self, key: str, entry: Tuple[str, bytes]):
+        with self._lock:
+            self.cache[key] = entry
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+
+class ApiError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _int_param(query: dict, name: str, default: int, minimum: int = 1, maximum: Optional[int] = None) -> int:
+    raw = query.get(name, [None])[0]
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"'{name}' must be an integer")
+    if value < minimum or (maximum is not None and value > maximum):
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"'{name}' is out of range")
+    return value
+
+
+def resolve(catalog: ProductCatalog, path: str, query: dict) -> dict:
+    """Answer one API request against ``catalog``; raises :class:`ApiError`."""
+    parts = [unquote(part) for part in path.strip("/").split("/") if part]
+    filters = {name: query.get(name, [None])[0] for name in ("creator", "category", "tag")}
+
+    if parts == ["health"]:
+        return {"version": catalog.version, "products": len(catalog.products), "export": catalog.path}
+
+    if parts and parts[0] == "products":
+        if len(parts) == 1:
+            page = _int_param(query, "page", 1)
+            per_page = _int_param(query, "per_page", 50, maximum=MAX_PER_PAGE)
+            selected = catalog.select(**filters)
+            start = (page - 1) * per_page
+            return {
+                "total": len(selected),
+                "page": page,
+                "per_page": per_page,
+                "items": [catalog.products[p] for p in selected[start:start + per_page]],
+            }
+        if len(parts) == 2:
+            position = catalog.by_uuid.get(parts[1])
+        elif len(parts) == 3 and parts[1] == "by-slug":
+            matches = catalog.by_product_slug.get(parts[2], [])
+            if not matches:
+                raise ApiError(HTTPStatus.NOT_FOUND, "product not found")
+            return {"total": len(matches), "items": [catalog.products[p] for p in matches]}
+        elif len(parts) == 4 and parts[1] == "by-slug":
+            position = catalog.by_slug.get(f"{parts[2]}/{parts[3]}")
+        else:
+            position = None
+        if position is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, "product not found")
+        return catalog.products[position]
+
+    if parts == ["top"]:
+        field = query.get("by", ["rating_count"])[0]
+        if field not in INT_FIELDS and field not in FLOAT_FIELDS:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"cannot rank by '{field}'")
+        limit = _int_param(query, "n", 10, maximum=MAX_PER_PAGE)
+        order = catalog.ranking(field)
+        if any(filters.values()):
+            allowed = set(catalog.select(**filters))
+            order = (p for p in order if p in allowed)
+        items = []
+        for position in order:
+            items.append(catalog.products[position])
+            if len(items) >= limit:
+                break
+        return {"by": field, "items": items}
+
+    raise ApiError(HTTPStatus.NOT_FOUND, "unknown endpoint")
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    server_version = "chunkgg-api"
+    holder: CatalogHolder = None
+
+    def do_GET(self):
+        catalog = self.holder.current()
+        cache_key = f"{catalog.version} {self.path}"
+        entry = self.holder.cached(cache_key)
+        if entry is None:
+            url = urlparse(self.path)
+            try:
+                payload = resolve(catalog, url.path, parse_qs(url.query))
+            except ApiError as exc:
+                self._send(exc.status, json.dumps({"error": exc.message}).encode("utf-8"))
+                return
+            body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+            etag = '"%s"' % hashlib.sha1(cache_key.encode("utf-8")).hexdigest()[:20]
+            entry = (etag, body)
+            self.holder.store(cache_key, entry)
+
+        etag, body = entry
+        if self.headers.get("If-None-Match") == etag:
+            self._send(HTTPStatus.NOT_MODIFIED, b"", etag)
+            return
+        self._send(HTTPStatus.OK, body, etag)
+
+    def _send(self, status: HTTPStatus, body: bytes, etag: Optional[str] = None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(export_path: str, host: str = "127.0.0.1", port: int = 8765, poll_interval: float = 2.0):
+    holder = CatalogHolder(export_path, poll_interval=poll_interval)
+    handler = type("BoundApiRequestHandler", (ApiRequestHandler,), {"holder": holder})
+    return ThreadingHTTPServer((host, port), handler)
@@ -0,0 +1,72 @@
+import json
+
+from scrapy.commands import ScrapyCommand
+from scrapy.exceptions import UsageError
+
+from chunkgg.extensions import compare_run, read_ledger
+
+
+class Command(ScrapyCommand):
+    requires_project = True
+    requires_crawler_process = False
+    default_settings = {"LOG_ENABLED": False}
+
+    def syntax(self):
+        return "[options]"
+
+    def short_desc(self):
+        return "Compare the latest crawl in the run ledger against a rolling baseline"
+
+    def add_options(self, parser):
+        super().add_options(parser)
+        parser.add_argument("--ledger", dest="ledger", help="ledger file (default: RUN_LEDGER_PATH)")
+        parser.add_argument("--window", dest="window", type=int, default=10, help="baseline size in runs")
+        parser.add_argument(
+            "--threshold",
+            dest="threshold",
+            type=float,
+            default=3.0,
+            help="robust z-score above which a metric is a regression",
+        )
+        parser.add_argument(
+            "--any-config",
+            dest="any_config",
+            action="store_true",
+            help="include baseline runs with different spider arguments or settings",
+        )
+
+    def run(self, args, opts):
+        path = opts.ledger or self.settings.get("RUN_LEDGER_PATH")
+        if not path:
+            raise UsageError("no ledger given and RUN_LEDGER_PATH is not set")
+        runs = [run for run in read_ledger(path) if run.get("finish_reason") == "finished"]
+        if not runs:
+            print(f"no finished runs in {path}")
+            return
+
+        latest = runs[-1]
+
+        def comparable(run):
+            if run["spider"] != latest["spider"]:
+                return False
+            if opts.any_config:
+                return True
+            return run.get("config") == latest.get("config") and run.get("settings") == latest.get("settings")
+
+        baseline = [run for run in runs[:-1] if comparable(run)][-opts.window:]
+        print(f"run {latest['started_at']} ({latest.get('git_commit') or 'unknown commit'})")
+        print(f"baseline: {len(baseline)} comparable runs")
+        print(f"config: {json.dumps(latest.get('config'), sort_keys=True)}")
+
+        findings = compare_run(latest, baseline, opts.threshold)
+        if not findings:
+            print("not enough comparable history (need 3 runs)")
+            return
+        for finding in findings:
+            flag = "REGRESSION" if finding["regression"] else "ok"
+            print(
+                f"{finding['metric']:<22} {finding['value']:>12.3f}  "
+                f"median {finding['median']:>12.3f}  z {finding['z']:>7.2f}  {flag}"
+            )
+        if any(finding["regression"] for finding in findings):
+            self.exitcode = 1
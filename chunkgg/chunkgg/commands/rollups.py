@@ -0,0 +1,52 @@
+import os
+
+from scrapy.commands import ScrapyCommand
+from scrapy.exceptions import UsageError
+
+from chunkgg.rollups import RollupTable, default_rollup_path
+
+
+class Command(ScrapyCommand):
+    requires_project = True
+    requires_crawler_process = False
+    default_settings = {"LOG_ENABLED": False}
+
+    def syntax(self):
+        return "[options] [<export>]"
+
+    def short_desc(self):
+        return "Sync the dashboard rollup table with a crawl export and print headline metrics"
+
+    def add_options(self, parser):
+        super().add_options(parser)
+        parser.add_argument("--rollups", dest="rollups", help="rollup file (default: ROLLUP_PATH)")
+        parser.add_argument("--rebuild", action="store_true", help="discard the existing rollups first")
+        parser.add_argument("-n", "--limit", dest="limit", type=int, default=10)
+
+    def run(self, args, opts):
+        for path in args:
+            if not os.path.exists(path):
+                raise UsageError(f"export not found: {path}")
+        if len(args) > 1:
+            raise UsageError("the rollup table mirrors a single export")
+        path = opts.rollups or self.settings.get("ROLLUP_PATH")
+        if not path:
+            if not args:
+                raise UsageError("no rollup file given and ROLLUP_PATH is not set")
+            path = default_rollup_path(args[0])
+
+        table = RollupTable() if opts.rebuild else RollupTable.open(path)
+        for export in args:
+            changed = table.update_from_export(export, force=opts.rebuild)
+            print(f"{export}: {changed} changed products")
+        if args:
+            table.save(path)
+
+        overall = table.group("all")
+        average = table.average_rating(overall)
+        print(f"products: {overall['products']}")
+        print(f"downloads: {overall['downloads']}")
+        print(f"ratings: {overall['rating_count']}  average: {average:.2f}" if average else "ratings: 0")
+        print(f"price quartiles (Minecoins): {table.price_quantiles(overall)}")
+        for row in table.top_products(opts.limit, by="rating_count"):
+            print(f"{row['rating_count']:>8}  {row['title'] or row['key']}")
@@ -0,0 +1,56 @@
+import os
+
+from scrapy.commands import ScrapyCommand
+from scrapy.exceptions import UsageError
+
+from chunkgg.search import SearchIndex, default_index_path
+
+
+class Command(ScrapyCommand):
+    requires_project = True
+    requires_crawler_process = False
+    default_settings = {"LOG_ENABLED": False}
+
+    def syntax(self):
+        return "[options] <export> [<export> ...]"
+
+    def short_desc(self):
+        return "Build or incrementally update the full-text search index"
+
+    def add_options(self, parser):
+        super().add_options(parser)
+        parser.add_argument(
+            "--index",
+            dest="index",
+            help="index file (default: SEARCH_INDEX_PATH, else next to the first export)",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="discard the existing index before indexing",
+        )
+        parser.add_argument("-q", "--query", dest="query", help="run a query after updating")
+        parser.add_argument("-n", "--limit", dest="limit", type=int, default=10)
+
+    def run(self, args, opts):
+        if not args:
+            raise UsageError("at least one crawl export is required")
+        for path in args:
+            if not os.path.exists(path):
+                raise UsageError(f"export not found: {path}")
+
+        index_path = opts.index or self.settings.get("SEARCH_INDEX_PATH") or default_index_path(args[0])
+        if os.path.exists(index_path) and not opts.rebuild:
+            index = SearchIndex.load(index_path)
+        else:
+            index = SearchIndex()
+
+        for path in args:
+            added, updated = index.update_from_export(path, force=opts.rebuild)
+            print(f"{path}: {added} added, {updated} updated")
+        index.save(index_path)
+        print(f"{len(index.docs)} documents in {index_path}")
+
+        if opts.query:
+            for key, score in index.search(opts.query, limit=opts.limit):
+                print(f"{score:8.3f}  {key}")
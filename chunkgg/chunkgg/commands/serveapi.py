@@ -0,0 +1,48 @@
+import os
+
+from scrapy.commands import ScrapyCommand
+from scrapy.exceptions import UsageError
+
+from chunkgg.api import make_server
+
+
+class Command(ScrapyCommand):
+    requires_project = True
+    requires_crawler_process = False
+    default_settings = {"LOG_ENABLED": False}
+
+    def syntax(self):
+        return "[options] [<export>]"
+
+    def short_desc(self):
+        return "Serve the latest crawl export as a local read-only JSON API"
+
+    def add_options(self, parser):
+        super().add_options(parser)
+        parser.add_argument("--host", dest="host", help="bind address (default: API_HOST)")
+        parser.add_argument("--port", dest="port", type=int, help="port (default: API_PORT)")
+        parser.add_argument(
+            "--poll",
+            dest="poll",
+            type=float,
+            help="seconds between checks for a new export (default: API_POLL_INTERVAL)",
+        )
+
+    def run(self, args, opts):
+        if len(args) > 1:
+            raise UsageError("at most one export can be served")
+        export = args[0] if args else self.settings.get("API_EXPORT_PATH")
+        if not export or not os.path.exists(export):
+            raise UsageError(f"export not found: {export}")
+        host = opts.host or self.settings.get("API_HOST")
+        port = opts.port or self.settings.getint("API_PORT")
+        poll = opts.poll if opts.poll is not None else self.settings.getfloat("API_POLL_INTERVAL")
+
+        server = make_server(export, host=host, port=port, poll_interval=poll)
+        print(f"Serving {export} on http://{host}:{port} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,85 @@
+import os
+from datetime import datetime
+
+from scrapy.commands import ScrapyCommand
+from scrapy.exceptions import UsageError
+
+from chunkgg.snapshots import is_listing_row, iter_rows
+from chunkgg.timeseries import DAY_SECONDS, METRICS, TimeSeriesStore
+
+
+class Command(ScrapyCommand):
+    requires_project = True
+    requires_crawler_process = False
+    default_settings = {"LOG_ENABLED": False}
+
+    def syntax(self):
+        return "[options] ingest <export> [<export> ...] | velocity"
+
+    def short_desc(self):
+        return "Backfill the product time-series store or report rating velocity"
+
+    def add_options(self, parser):
+        super().add_options(parser)
+        parser.add_argument("--store", dest="store", help="store file (default: TIMESERIES_PATH)")
+        parser.add_argument(
+            "--at",
+            dest="at",
+            help="ISO timestamp for ingested exports (default: each file's modification time)",
+        )
+        parser.add_argument("--days", dest="days", type=float, default=7.0, help="velocity window in days")
+        parser.add_argument("--metric", dest="metric", default="rating_count", choices=sorted(METRICS))
+        parser.add_argument("-n", "--limit", dest="limit", type=int, default=20)
+
+    def run(self, args, opts):
+        if not args or args[0] not in ("ingest", "velocity"):
+            raise UsageError("expected 'ingest' or 'velocity'")
+        path = opts.store or self.settings.get("TIMESERIES_PATH")
+        if not path:
+            raise UsageError("no store given and TIMESERIES_PATH is not set")
+        store = TimeSeriesStore.open(path)
+
+        if args[0] == "ingest":
+            exports = args[1:]
+            if not exports:
+                raise UsageError("ingest needs at least one crawl export")
+            if opts.at and len(exports) > 1:
+                # One timestamp for several exports would drop all but the first.
+                raise UsageError("--at applies to a single export")
+            stamped = []
+            for export in exports:
+                if not os.path.exists(export):
+                    raise UsageError(f"export not found: {export}")
+                if opts.at:
+                    timestamp = int(datetime.fromisoformat(opts.at).timestamp())
+                else:
+                    timestamp = int(os.path.getmtime(export))
+                stamped.append((timestamp, export))
+            # The store only appends, so feed older snapshots first.
+            previous = None
+            for timestamp, export in sorted(stamped):
+                if previous is not None and timestamp <= previous:
+                    print(f"warning: {export} has the same timestamp as the previous export; its rows are skipped")
+                previous = timestamp
+                recorded = 0
+                for row in iter_rows(export):
+                    uuid = row.get("uuid") or row.get("uid")
+                    if not uuid:
+                        continue
+                    partial = is_listing_row(row)
+                    if partial:
+                        # Listing cards leave most columns empty; keep the last readings.
+                        row = {key: value for key, value in row.items() if value is not None}
+                    if store.record(uuid, timestamp, row, slug=row.get("slug"), carry_forward=partial):
+                        recorded += 1
+                print(f"{export}: {recorded} observations")
+            store.save(path)
+            return
+
+        end = max((series.last_time for series in store.series.values() if len(series)), default=None)
+        if end is None:
+            print("store is empty")
+            return
+        start = end - int(opts.days * DAY_SECONDS)
+        for uuid, rate in store.top_velocity(opts.limit, opts.metric, start, end):
+            print(f"{rate:10.2f}/day  {uuid}")
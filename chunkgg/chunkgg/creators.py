@@ -0,0 +1,89 @@
+import json
+from collections import Counter
+from typing import Optional
+
+from itemadapter import ItemAdapter
+
+from chunkgg.items import CreatorItem
+
+
+class CreatorStats:
+    """Running aggregates for one creator, updated as each of their products is parsed."""
+
+    def __init__(self, slug: str):
+        self.slug = slug
+        self.name: Optional[str] = None
+        self.url: Optional[str] = None
+        self.listed = set()
+        self.listing_done = False
+        self.parsed = set()
+        self.categories: Counter = Counter()
+        self.rated = 0
+        self.rating_sum = 0.0
+        self.rating_weighted_sum = 0.0
+        self.rating_count_total = 0
+        self.free = 0
+        self.paid = 0
+        self.price_sum = 0
+        self.price_min: Optional[int] = None
+        self.price_max: Optional[int] = None
+        self.emitted = False
+
+    @property
+    def complete(self) -> bool:
+        """The creator listing was read and every product on it has been parsed."""
+        return self.listing_done and self.listed <= self.parsed
+
+    def add(self, item) -> bool:
+        adapter = ItemAdapter(item)
+        key = adapter.get("slug")
+        if not key or key in self.parsed:
+            return False
+        self.parsed.add(key)
+        self.name = self.name or adapter.get("creator")
+        self.url = self.url or adapter.get("creator_url")
+        if adapter.get("category"):
+            self.categories[adapter["category"]] += 1
+
+        rating_value = adapter.get("rating_value")
+        rating_count = adapter.get("rating_count") or 0
+        if rating_value is not None:
+            self.rated += 1
+            self.rating_sum += rating_value
+            self.rating_weighted_sum += rating_value * rating_count
+        self.rating_count_total += rating_count
+
+        price = adapter.get("price_minecoins")
+        if price is not None:
+            if price == 0:
+                self.free += 1
+            else:
+                self.paid += 1
+            self.price_sum += price
+            self.price_min = price if self.price_min is None else min(self.price_min, price)
+            self.price_max = price if self.price_max is None else max(self.price_max, price)
+        return True
+
+    def to_item(self) -> CreatorItem:
+        priced = self.free + self.paid
+        return CreatorItem(
+            creator_slug=self.slug,
+            creator=self.name,
+            creator_url=self.url or f"https://chunk.gg/@{self.slug}",
+            catalogue_size=len(self.listed | self.parsed),
+            products_parsed=len(self.parsed),
+            categories=json.dumps(dict(self.categories), ensure_ascii=False),
+            rated_products=self.rated,
+            rating_avg=round(self.rating_sum / self.rated, 3) if self.rated else None,
+            rating_weighted_avg=(
+                round(self.rating_weighted_sum / self.rating_count_total, 3)
+                if self.rating_count_total
+                else None
+            ),
+            rating_count_total=self.rating_count_total,
+            free_products=self.free,
+            paid_products=self.paid,
+            price_minecoins_min=self.price_min,
+            price_minecoins_max=self.price_max,
+            price_minecoins_avg=round(self.price_sum / priced, 1) if priced else None,
+        )
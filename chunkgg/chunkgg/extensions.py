@@ -0,0 +1,184 @@
+import json
+import os
+import statistics
+import subprocess
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from itemadapter import ItemAdapter
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+from chunkgg.items import CreatorItem
+
+# Settings copied into every ledger record so runs can be told apart.
+LEDGER_SETTINGS = (
+    "CONCURRENT_REQUESTS",
+    "CONCURRENT_REQUESTS_PER_DOMAIN",
+    "DOWNLOAD_DELAY",
+    "AUTOTHROTTLE_ENABLED",
+    "HTTPCACHE_ENABLED",
+    "COMPACT_ITEMS",
+    "GALLERY_METADATA_ENABLED",
+    "GALLERY_PHASH",
+)
+
+# ledger metric -> True when a higher value is worse
+LEDGER_METRICS = {
+    "wall_seconds": True,
+    "items_per_second": False,
+    "parse_product_avg_ms": True,
+    "requests_per_item": True,
+    "bytes_per_item": True,
+    "retry_rate": True,
+}
+
+# Smallest spread each metric is scored against, so a flat (often all-zero)
+# history does not turn a single retry or a few milliseconds into a regression.
+LEDGER_MIN_SPREAD = {
+    "wall_seconds": 5.0,
+    "items_per_second": 0.05,
+    "parse_product_avg_ms": 2.0,
+    "requests_per_item": 0.05,
+    "bytes_per_item": 2048.0,
+    "retry_rate": 0.01,
+}
+
+
+def read_ledger(path: str) -> List[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+def _ratio(numerator, denominator) -> Optional[float]:
+    if not denominator or numerator is None:
+        return None
+    return numerator / denominator
+
+
+class RunLedger:
+    """Appends one JSON line of crawl performance figures to ``RUN_LEDGER_PATH`` per run."""
+
+    def __init__(self, crawler, path: str):
+        self.crawler = crawler
+        self.path = path
+        self.started = None
+        self.started_at = None
+        self.requests_by_callback: Counter = Counter()
+        self.items_by_category: Counter = Counter()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get("RUN_LEDGER_PATH")
+        if not path:
+            raise NotConfigured("RUN_LEDGER_PATH is not set")
+        ext = cls(crawler, path)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.request_scheduled, signal=signals.request_scheduled)
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_opened(self, spider):
+        self.started = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc)
+
+    def request_scheduled(self, request, spider):
+        self.requests_by_callback[getattr(request.callback, "__name__", "parse")] += 1
+
+    def item_scraped(self, item, response, spider):
+        if isinstance(item, CreatorItem):
+            return
+        self.items_by_category[ItemAdapter(item).get("category") or "unknown"] += 1
+
+    def spider_closed(self, spider, reason):
+        stats = self.crawler.stats
+        settings = self.crawler.settings
+        wall_seconds = time.perf_counter() - self.started
+        items = stats.get_value("item_scraped_count", 0)
+        requests = stats.get_value("downloader/request_count", 0)
+        response_bytes = stats.get_value("downloader/response_bytes", 0)
+        retries = stats.get_value("retry/count", 0)
+        parse_seconds = stats.get_value("chunkgg/parse_product_seconds", 0.0)
+        parse_count = stats.get_value("chunkgg/parse_product_count", 0)
+        parse_avg = _ratio(parse_seconds, parse_count)
+
+        record = {
+            "started_at": self.started_at.isoformat(),
+            "spider": spider.name,
+            "finish_reason": reason,
+            "git_commit": _git_commit(),
+            "config": getattr(spider, "run_config", {}),
+            "settings": {name: settings.get(name) for name in LEDGER_SETTINGS},
+            "wall_seconds": round(wall_seconds, 3),
+            "requests": requests,
+            "requests_by_callback": dict(self.requests_by_callback),
+            "response_bytes": response_bytes,
+            "items": items,
+            "items_by_category": dict(self.items_by_category),
+            "retries": retries,
+            "items_per_second": _ratio(items, wall_seconds),
+            "parse_product_avg_ms": parse_avg * 1000 if parse_avg is not None else None,
+            "requests_per_item": _ratio(requests, items),
+            "bytes_per_item": _ratio(response_bytes, items),
+            "retry_rate": _ratio(retries, requests),
+        }
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        spider.logger.info("Run ledger updated: %s", self.path)
+
+
+def compare_run(run: dict, baseline: List[dict], threshold: float = 3.0) -> List[dict]:
+    """Robust z-score (median/MAD) of each ledger metric against ``baseline`` runs.
+
+    Returns one entry per metric with enough history; ``regression`` is set
+    when the run is worse than the baseline by more than ``threshold``. The
+    spread never drops below ``LEDGER_MIN_SPREAD / threshold``, so a metric
+    has to move by at least its floor before it can be flagged.
+    """
+    findings = []
+    for metric, higher_is_worse in LEDGER_METRICS.items():
+        value = run.get(metric)
+        history = [r[metric] for r in baseline if r.get(metric) is not None]
+        if value is None or len(history) < 3:
+            continue
+        median = statistics.median(history)
+        spread = statistics.median(abs(v - median) for v in history) * 1.4826
+        if not spread:
+            spread = statistics.pstdev(history)
+        if not spread:
+            # Flat history: any move of more than 5% is worth flagging.
+            spread = abs(median) * 0.05 / threshold
+        spread = max(spread, LEDGER_MIN_SPREAD[metric] / threshold)
+        score = (value - median) / spread
+        worse = score if higher_is_worse else -score
+        findings.append(
+            {
+                "metric": metric,
+                "value": value,
+                "median": median,
+                "z": score,
+                "regression": worse > threshold,
+            }
+        )
+    return findings
@@ -0,0 +1,123 @@
+"""Image metadata helpers for the gallery pipeline.
+
+Dimensions are read straight from the PNG/GIF/WebP/JPEG headers so a ranged
+request for the first few kilobytes is usually enough. The perceptual hash
+needs the whole image and Pillow, which is only imported when asked for.
+"""
+
+import json
+import os
+import re
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+
+_JPEG_SOF_MARKERS = frozenset(
+    [0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF]
+)
+_CONTENT_RANGE_RE = re.compile(r"bytes\s+\d+-\d+/(\d+)")
+
+
+def sniff_image(data: bytes) -> Tuple[Optional[str], Optional[int], Optional[int]]:
+    """Return ``(format, width, height)`` from the leading bytes of an image."""
+    if data.startswith(b"\x89PNG\r\n\x1a\n") and len(data) >= 24:
+        return "png", int.from_bytes(data[16:20], "big"), int.from_bytes(data[20:24], "big")
+
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        return "gif", int.from_bytes(data[6:8], "little"), int.from_bytes(data[8:10], "little")
+
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP" and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b"VP8 ":
+            width = int.from_bytes(data[26:28], "little") & 0x3FFF
+            height = int.from_bytes(data[28:30], "little") & 0x3FFF
+            return "webp", width, height
+        if chunk == b"VP8L":
+            b0, b1, b2, b3 = data[21:25]
+            width = 1 + (((b1 & 0x3F) << 8) | b0)
+            height = 1 + (((b3 & 0x0F) << 10) | (b2 << 2) | ((b1 & 0xC0) >> 6))
+            return "webp", width, height
+        if chunk == b"VP8X":
+            width = 1 + int.from_bytes(data[24:27], "little")
+            height = 1 + int.from_bytes(data[27:30], "little")
+            return "webp", width, height
+        return "webp", None, None
+
+    if data[:2] == b"\xff\xd8":
+        index = 2
+        while index + 9 < len(data):
+            if data[index] != 0xFF:
+                index += 1
+                continue
+            marker = data[index + 1]
+            if marker == 0xFF:
+                index += 1
+                continue
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                index += 2
+                continue
+            length = int.from_bytes(data[index + 2:index + 4], "big")
+            if marker in _JPEG_SOF_MARKERS:
+                height = int.from_bytes(data[index + 5:index + 7], "big")
+                width = int.from_bytes(data[index + 7:index + 9], "big")
+                return "jpeg", width, height
+            index += 2 + length
+        return "jpeg", None, None
+
+    return None, None, None
+
+
+def total_size(headers, body_length: int) -> Optional[int]:
+    """Full object size from ``Content-Range`` (ranged reads) or the body itself."""
+    content_range = headers.get(b"Content-Range")
+    if content_range:
+        match = _CONTENT_RANGE_RE.search(content_range.decode("latin-1"))
+        if match:
+            return int(match.group(1))
+        return None
+    return body_length
+
+
+def dhash(data: bytes, size: int = 8) -> Tuple[str, int, int]:
+    """64-bit difference hash of an image plus its decoded ``(width, height)``.
+
+    Near-identical screenshots (re-encoded or resized) land within a few bits
+    of each other, so compare hashes by Hamming distance.
+    """
+    from PIL import Image
+
+    with Image.open(BytesIO(data)) as image:
+        width, height = image.size
+        pixels = list(
+            image.convert("L").resize((size + 1, size), Image.Resampling.LANCZOS).getdata()
+        )
+    value = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return f"{value:0{size * size // 4}x}", width, height
+
+
+class ImageMetadataCache:
+    """URL-keyed metadata persisted as JSON; entries remember the ETag they came from."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as handle:
+                self.entries = json.load(handle)
+
+    def get(self, url: str) -> Optional[dict]:
+        return self.entries.get(url)
+
+    def put(self, url: str, metadata: dict):
+        self.entries[url] = metadata
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(self.entries, handle, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
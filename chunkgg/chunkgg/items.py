@@ -1,4 +1,11 @@
+import json
+from array import array
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse
+
 import scrapy
+from attrs import define, fields_dict
+
 
 class MarketplaceItem(scrapy.Item):
     """Normalized product record emitted by the chunk.gg crawler."""
@@ -28,6 +35,7 @@ class MarketplaceItem(scrapy.Item):
 
     # Media
     gallery = scrapy.Field()
+    gallery_meta = scrapy.Field()
 
     # Pricing
     price_minecoins = scrapy.Field()
@@ -67,3 +75,178 @@ class MarketplaceItem(scrapy.Item):
     trailer_url = scrapy.Field()
     trailer_views = scrapy.Field()
     trailer_likes = scrapy.Field()
+
+    # Set on partial items built from listing cards (mode=listing)
+    listing_only = scrapy.Field()
+
+
+RATING_STARS = (5, 4, 3, 2, 1)
+# Sentinel stored in the compact rating array for a missing count/percent.
+_MISSING = -1
+# MarketplaceItem fields that parse_product always assigns, even when empty.
+_ALWAYS_SET = (
+    "product_url",
+    "slug",
+    "category",
+    "title",
+    "creator",
+    "description",
+    "tags",
+    "price_minecoins",
+    "is_free",
+    "price_usd",
+    "price_eur",
+    "has_trailer",
+    "downloads",
+    "gallery",
+)
+
+
+def split_product_path(path: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Return ``(creator_slug, product_slug)`` for a ``/@creator/product`` path."""
+    creator_slug = None
+    product_slug = None
+    if path:
+        parts = path.strip("/").split("/")
+        if parts:
+            handle = parts[0]
+            if handle.startswith("@"):
+                handle = handle[1:]
+            creator_slug = handle or None
+        if len(parts) >= 2:
+            product_slug = parts[-1] or None
+    return creator_slug, product_slug
+
+
+@define(slots=True)
+class CompactMarketplaceItem:
+    """Slotted variant of :class:`MarketplaceItem` for memory-bound pipelines.
+
+    Redundant columns are not stored: the slug variants are derived from
+    ``product_url``, ``is_free`` from ``price_minecoins`` and the per-star
+    rating columns live in ``ratings``, a fixed ``array('q')`` holding
+    ``[count, percent]`` pairs for stars 5 to 1 (``-1`` marks a missing
+    value). Call :meth:`expand` to get the full export schema back.
+    """
+
+    product_url: Optional[str] = None
+    uuid: Optional[str] = None
+    category: Optional[str] = None
+    creator: Optional[str] = None
+    creator_url: Optional[str] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    tags: Optional[List[str]] = None
+    badge_labels: Optional[str] = None
+    badge_modifiers: Optional[str] = None
+    skin_count: Optional[int] = None
+    player_range: Optional[str] = None
+    supports_singleplayer: Optional[bool] = None
+    supports_multiplayer: Optional[bool] = None
+    gallery: Optional[List[str]] = None
+    gallery_meta: Optional[str] = None
+    price_minecoins: Optional[int] = None
+    price_usd: Optional[float] = None
+    price_eur: Optional[float] = None
+    rating_value: Optional[float] = None
+    rating_out_of: Optional[int] = None
+    rating_count: Optional[int] = None
+    ratings: Optional[array] = None
+    downloads: Optional[int] = None
+    min_version: Optional[str] = None
+    launched: Optional[str] = None
+    launched_iso: Optional[str] = None
+    last_updated: Optional[str] = None
+    last_updated_iso: Optional[str] = None
+    changelog: Optional[str] = None
+    has_trailer: Optional[bool] = None
+    trailer_url: Optional[str] = None
+    trailer_views: Optional[int] = None
+    trailer_likes: Optional[int] = None
+
+    @classmethod
+    def from_item(cls, item: MarketplaceItem) -> "CompactMarketplaceItem":
+        compact = cls()
+        for name in fields_dict(cls):
+            if name in item:
+                setattr(compact, name, item[name])
+        if item.get("rating_breakdown"):
+            ratings = array("q", [_MISSING] * (2 * len(RATING_STARS)))
+            for index, star in enumerate(RATING_STARS):
+                count = item.get(f"rating_{star}_count")
+                percent = item.get(f"rating_{star}_percent")
+                if count is not None:
+                    ratings[2 * index] = count
+                if percent is not None:
+                    ratings[2 * index + 1] = percent
+            compact.ratings = ratings
+        return compact
+
+    def rating_breakdown(self) -> List[dict]:
+        breakdown: List[dict] = []
+        if self.ratings is None:
+            return breakdown
+        for index, star in enumerate(RATING_STARS):
+            count = self.ratings[2 * index]
+            percent = self.ratings[2 * index + 1]
+            if count == _MISSING and percent == _MISSING:
+                continue
+            entry = {"star": star}
+            if count != _MISSING:
+                entry["count"] = count
+            if percent != _MISSING:
+                entry["percent"] = percent
+            breakdown.append(entry)
+        return breakdown
+
+    def expand(self) -> MarketplaceItem:
+        """Rebuild the full :class:`MarketplaceItem`, including derived columns."""
+        item = MarketplaceItem()
+        slug_path = urlparse(self.product_url).path if self.product_url else None
+        creator_slug, product_slug = split_product_path(slug_path)
+        derived = {
+            "slug": slug_path,
+            "creator_slug": creator_slug,
+            "product_slug": product_slug,
+            "is_free": self.price_minecoins == 0 if self.price_minecoins is not None else None,
+        }
+        stored = fields_dict(type(self))
+        for name in MarketplaceItem.fields:
+            if name in derived:
+                value = derived[name]
+            elif name in stored:
+                value = getattr(self, name)
+            else:
+                continue
+            if value is not None or name in _ALWAYS_SET:
+                item[name] = value
+
+        breakdown = self.rating_breakdown()
+        if breakdown:
+            for index, star in enumerate(RATING_STARS):
+                count = self.ratings[2 * index]
+                percent = self.ratings[2 * index + 1]
+                item[f"rating_{star}_count"] = None if count == _MISSING else count
+                item[f"rating_{star}_percent"] = None if percent == _MISSING else percent
+            item["rating_breakdown"] = json.dumps(breakdown, ensure_ascii=False)
+        return item
+
+
+class CreatorItem(scrapy.Item):
+    """Per-creator aggregates emitted by the optional creator stage."""
+
+    creator_slug = scrapy.Field()
+    creator = scrapy.Field()
+    creator_url = scrapy.Field()
+    catalogue_size = scrapy.Field()
+    products_parsed = scrapy.Field()
+    categories = scrapy.Field()
+    rated_products = scrapy.Field()
+    rating_avg = scrapy.Field()
+    rating_weighted_avg = scrapy.Field()
+    rating_count_total = scrapy.Field()
+    free_products = scrapy.Field()
+    paid_products = scrapy.Field()
+    price_minecoins_min = scrapy.Field()
+    price_minecoins_max = scrapy.Field()
+    price_minecoins_avg = scrapy.Field()
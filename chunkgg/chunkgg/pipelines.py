@@ -5,9 +5,300 @@
 
 
 # useful for handling different item types with a single interface
+import json
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import scrapy
 from itemadapter import ItemAdapter
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.defer import deferred_from_coro, maybe_deferred_to_future
+from twisted.internet.defer import Deferred, DeferredList, DeferredSemaphore
+from twisted.python.threadpool import ThreadPool
+
+from chunkgg.images import ImageMetadataCache, dhash, sniff_image, total_size
+from chunkgg.items import CompactMarketplaceItem, CreatorItem
+from chunkgg.rollups import RollupTable
+from chunkgg.timeseries import METRICS, TimeSeriesStore
 
 
 class ChunkggPipeline:
     def process_item(self, item, spider):
         return item
+
+
+class CompactItemExpansionPipeline:
+    """Expands :class:`CompactMarketplaceItem` records right before export.
+
+    Keep this pipeline last so buffering stages in front of it hold the
+    compact representation; plain ``MarketplaceItem`` objects pass through.
+    """
+
+    def process_item(self, item, spider):
+        if isinstance(item, CompactMarketplaceItem):
+            return item.expand()
+        return item
+
+
+class TimeSeriesPipeline:
+    """Appends each product's rating, price and trailer metrics to the time-series store.
+
+    All items of one crawl share the crawl start time as their timestamp.
+    Disabled when ``TIMESERIES_PATH`` is empty.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.store = None
+        self.timestamp = None
+        self.recorded = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get("TIMESERIES_PATH")
+        if not path:
+            raise NotConfigured("TIMESERIES_PATH is not set")
+        return cls(path)
+
+    def open_spider(self, spider):
+        self.store = TimeSeriesStore.open(self.path)
+        self.timestamp = int(time.time())
+
+    def process_item(self, item, spider):
+        if isinstance(item, CompactMarketplaceItem):
+            adapter = ItemAdapter(item.expand())
+        else:
+            adapter = ItemAdapter(item)
+        uuid = adapter.get("uuid")
+        if not uuid:
+            return item
+        slug = adapter.get("slug")
+        if not slug and adapter.get("product_url"):
+            slug = urlparse(adapter["product_url"]).path
+        # Listing cards and ``-a fields=`` runs only carry some of the metrics.
+        partial = bool(adapter.get("listing_only")) or getattr(spider, "fields", None) is not None
+        values = {metric: adapter[metric] for metric in METRICS if metric in adapter}
+        if self.store.record(uuid, self.timestamp, values, slug=slug, carry_forward=partial):
+            self.recorded += 1
+        return item
+
+    def close_spider(self, spider):
+        self.store.save(self.path)
+        spider.logger.info("Recorded %d products in %s", self.recorded, self.path)
+
+
+class RollupPipeline:
+    """Keeps the dashboard rollup table (``ROLLUP_PATH``) current as products are scraped.
+
+    Only products whose contribution changed touch the aggregates. Partial
+    items (listing cards, field-selected runs) are skipped because they
+    would overwrite complete contributions with empty values.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.table = None
+        self.enabled = True
+        self.changed = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get("ROLLUP_PATH")
+        if not path:
+            raise NotConfigured("ROLLUP_PATH is not set")
+        return cls(path)
+
+    def open_spider(self, spider):
+        self.enabled = getattr(spider, "fields", None) is None
+        if not self.enabled:
+            spider.logger.info("Field selection active; rollups are not updated")
+            return
+        self.table = RollupTable.open(self.path)
+
+    def process_item(self, item, spider):
+        if not self.enabled or isinstance(item, CreatorItem):
+            return item
+        if isinstance(item, CompactMarketplaceItem):
+            row = ItemAdapter(item.expand()).asdict()
+        else:
+            row = ItemAdapter(item).asdict()
+        self.changed += self.table.update([row])
+        return item
+
+    def close_spider(self, spider):
+        if not self.enabled:
+            return
+        self.table.save(self.path)
+        spider.logger.info("Rollups updated for %d changed products in %s", self.changed, self.path)
+
+
+class GalleryMetadataPipeline:
+    """Adds ``gallery_meta``: size, dimensions, content type and a perceptual hash per gallery image.
+
+    Images go through the crawler's own downloader, at most
+    ``GALLERY_CONCURRENCY`` at a time. Without ``GALLERY_PHASH`` only the
+    first ``GALLERY_RANGE_BYTES`` are requested, which is enough to read the
+    dimensions from the image header. Hashing needs the full image and runs
+    in a thread pool of ``GALLERY_WORKERS``. Results are cached by URL in
+    ``GALLERY_CACHE_PATH`` together with the ETag, so an image is fetched
+    once across runs (or revalidated with ``If-None-Match`` when
+    ``GALLERY_REVALIDATE`` is on).
+    """
+
+    def __init__(
+        self,
+        crawler,
+        cache_path: Optional[str],
+        concurrency: int,
+        range_bytes: int,
+        compute_hash: bool,
+        workers: int,
+        revalidate: bool,
+    ):
+        self.crawler = crawler
+        self.cache_path = cache_path
+        self.concurrency = concurrency
+        self.range_bytes = range_bytes
+        self.compute_hash = compute_hash
+        self.workers = workers
+        self.revalidate = revalidate
+        self.cache = None
+        self._slots = None
+        self._pool = None
+        self._checked = set()
+        self._inflight: Dict[str, List[Deferred]] = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("GALLERY_METADATA_ENABLED"):
+            raise NotConfigured("GALLERY_METADATA_ENABLED is off")
+        compute_hash = settings.getbool("GALLERY_PHASH")
+        if compute_hash:
+            try:
+                import PIL  # noqa: F401
+            except ImportError:
+                raise NotConfigured("GALLERY_PHASH requires Pillow")
+        return cls(
+            crawler,
+            cache_path=settings.get("GALLERY_CACHE_PATH"),
+            concurrency=settings.getint("GALLERY_CONCURRENCY", 4),
+            range_bytes=settings.getint("GALLERY_RANGE_BYTES", 65536),
+            compute_hash=compute_hash,
+            workers=settings.getint("GALLERY_WORKERS", 2),
+            revalidate=settings.getbool("GALLERY_REVALIDATE"),
+        )
+
+    def open_spider(self, spider):
+        self.cache = ImageMetadataCache(self.cache_path)
+        self._slots = DeferredSemaphore(self.concurrency)
+        if self.compute_hash:
+            self._pool = ThreadPool(minthreads=1, maxthreads=self.workers, name="gallery-metadata")
+            self._pool.start()
+
+    def close_spider(self, spider):
+        if self._pool is not None:
+            self._pool.stop()
+        self.cache.save()
+
+    async def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+        urls = adapter.get("gallery") or []
+        if not urls:
+            return item
+        results = await maybe_deferred_to_future(
+            DeferredList([deferred_from_coro(self._metadata(url)) for url in urls], consumeErrors=True)
+        )
+        gallery_meta = []
+        for url, (success, value) in zip(urls, results):
+            if not success:
+                spider.logger.warning("Gallery image %s failed: %s", url, value.getErrorMessage())
+                continue
+            if value:
+                entry = {"url": url}
+                entry.update((key, val) for key, val in value.items() if key != "etag")
+                gallery_meta.append(entry)
+        adapter["gallery_meta"] = json.dumps(gallery_meta, ensure_ascii=False)
+        return item
+
+    async def _metadata(self, url: str) -> Optional[dict]:
+        cached = self.cache.get(url)
+        if cached is not None and self.compute_hash and not cached.get("phash"):
+            # Cached by a header-only run; the image still has to be hashed.
+            cached = None
+        if cached is not None and (not self.revalidate or url in self._checked):
+            return cached
+        if url in self._inflight:
+            waiter = Deferred()
+            self._inflight[url].append(waiter)
+            return await maybe_deferred_to_future(waiter)
+
+        self._inflight[url] = []
+        try:
+            metadata = await self._fetch(url, cached)
+        except Exception as exc:
+            for waiter in self._inflight.pop(url):
+                waiter.errback(exc)
+            raise
+        for waiter in self._inflight.pop(url):
+            waiter.callback(metadata)
+        return metadata
+
+    async def _fetch(self, url: str, cached: Optional[dict]) -> Optional[dict]:
+        headers = {}
+        if not self.compute_hash:
+            headers["Range"] = f"bytes=0-{self.range_bytes - 1}"
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+
+        response = await self._download(url, headers)
+        if response.status == 304 and cached is not None:
+            self._checked.add(url)
+            return cached
+        if response.status not in (200, 206):
+            self.crawler.spider.logger.warning("Gallery image %s returned HTTP %d", url, response.status)
+            return None
+
+        image_format, width, height = sniff_image(response.body)
+        if width is None and response.status == 206:
+            # Header sits past the ranged window (large EXIF block); take it all.
+            response = await self._download(url, {})
+            image_format, width, height = sniff_image(response.body)
+        if image_format is None:
+            # Not an image (or an unknown format); leave it uncached so it is retried.
+            self.crawler.spider.logger.warning("Gallery image %s is not a recognised image", url)
+            return None
+        etag = response.headers.get(b"ETag")
+        content_type = response.headers.get(b"Content-Type")
+        metadata = {
+            "content_type": content_type.decode("latin-1") if content_type else None,
+            "bytes": total_size(response.headers, len(response.body)),
+            "width": width,
+            "height": height,
+            "etag": etag.decode("latin-1") if etag else None,
+        }
+        if self.compute_hash:
+            from twisted.internet import reactor
+            from twisted.internet.threads import deferToThreadPool
+
+            phash, width, height = await maybe_deferred_to_future(
+                deferToThreadPool(reactor, self._pool, dhash, response.body)
+            )
+            metadata.update(phash=phash, width=width, height=height)
+
+        # Results without dimensions are not cached, so the next run retries them.
+        if width is not None:
+            self.cache.put(url, metadata)
+        self._checked.add(url)
+        return metadata
+
+    async def _download(self, url: str, headers: dict):
+        request = scrapy.Request(
+            url,
+            headers=headers,
+            dont_filter=True,
+            priority=-10,
+            meta={"allow_offsite": True, "handle_httpstatus_all": True},
+        )
+        return await maybe_deferred_to_future(self._slots.run(self.crawler.engine.download, request))
@@ -0,0 +1,249 @@
+"""Precomputed dashboard aggregates maintained incrementally from crawl data.
+
+Each product contributes one small record to every group it belongs to
+(overall, creator, category, each tag and launch day). When a product changes
+its old contribution is subtracted and the new one added, so an update costs
+work proportional to the changed products only. Price quantiles come from a
+per-group histogram of Minecoin prices, which stays exact under removal.
+"""
+
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+from chunkgg.items import RATING_STARS
+from chunkgg.snapshots import as_list, is_listing_row, iter_rows, row_key, to_float, to_int
+
+ROLLUP_VERSION = 1
+DEFAULT_ROLLUP_NAME = "rollups.json"
+DIMENSIONS = ("all", "creator", "category", "tag", "day")
+
+
+def default_rollup_path(export_path: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(export_path)), DEFAULT_ROLLUP_NAME)
+
+
+def _contribution(row: dict) -> dict:
+    downloads = to_int(row.get("downloads")) or 0
+    price_usd = to_float(row.get("price_usd"))
+    if price_usd is None and isinstance(row.get("prices"), dict):
+        price_usd = to_float(row["prices"].get("USD"))
+    launched = row.get("launched_iso") or row.get("published") or ""
+    return {
+        "title": row.get("title"),
+        "creator": row.get("creator"),
+        "category": row.get("category"),
+        "tags": sorted(set(as_list(row.get("tags")))),
+        "day": launched[:10] or None,
+        "downloads": downloads,
+        "rating_count": to_int(row.get("rating_count")) or 0,
+        "rating_value": to_float(row.get("rating_value")),
+        "stars": [to_int(row.get(f"rating_{star}_count")) or 0 for star in RATING_STARS],
+        "price_minecoins": to_int(row.get("price_minecoins")),
+        "price_usd": price_usd,
+        "revenue_usd": downloads * price_usd if price_usd is not None else 0.0,
+    }
+
+
+def _empty_group() -> dict:
+    return {
+        "products": 0,
+        "downloads": 0,
+        "revenue_usd": 0.0,
+        "rating_count": 0,
+        "rated": 0,
+        "rating_value_sum": 0.0,
+        "stars": [0] * len(RATING_STARS),
+        "free": 0,
+        "prices": {},
+    }
+
+
+class RollupTable:
+    """Per-dimension aggregates plus the per-product contributions they were built from."""
+
+    def __init__(self):
+        self.groups: Dict[str, Dict[str, dict]] = {dimension: {} for dimension in DIMENSIONS}
+        self.products: Dict[str, dict] = {}
+        self.sources: Dict[str, float] = {}
+
+    @staticmethod
+    def _group_keys(contribution: dict):
+        yield "all", "*"
+        if contribution["creator"]:
+            yield "creator", contribution["creator"]
+        if contribution["category"]:
+            yield "category", contribution["category"]
+        for tag in contribution["tags"]:
+            yield "tag", tag
+        if contribution["day"]:
+            yield "day", contribution["day"]
+
+    def _apply(self, contribution: dict, sign: int):
+        for dimension, key in self._group_keys(contribution):
+            groups = self.groups[dimension]
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = _empty_group()
+            group["products"] += sign
+            group["downloads"] += sign * contribution["downloads"]
+            group["revenue_usd"] += sign * contribution["revenue_usd"]
+            group["rating_count"] += sign * contribution["rating_count"]
+            if contribution["rating_value"] is not None:
+                group["rated"] += sign
+                group["rating_value_sum"] += sign * contribution["rating_value"]
+            for index, count in enumerate(contribution["stars"]):
+                group["stars"][index] += sign * count
+            price = contribution["price_minecoins"]
+            if price is not None:
+                if price == 0:
+                    group["free"] += sign
+                bucket = str(price)
+                group["prices"][bucket] = group["prices"].get(bucket, 0) + sign
+                if not group["prices"][bucket]:
+                    del group["prices"][bucket]
+            if not group["products"]:
+                del groups[key]
+
+    def update(self, rows: Iterable[dict], seen: Optional[set] = None) -> int:
+        """Fold rows in, touching only products whose contribution changed.
+
+        Partial listing rows are skipped; they would replace a complete
+        contribution with empty values. Every row key is added to ``seen``.
+        """
+        changed = 0
+        for row in rows:
+            key = row_key(row)
+            if not key:
+                continue
+            if seen is not None:
+                seen.add(key)
+            if is_listing_row(row):
+                continue
+            contribution = _contribution(row)
+            previous = self.products.get(key)
+            if previous == contribution:
+                continue
+            if previous is not None:
+                self._apply(previous, -1)
+            self._apply(contribution, 1)
+            self.products[key] = contribution
+            changed += 1
+        return changed
+
+    def remove(self, key: str) -> bool:
+        contribution = self.products.pop(key, None)
+        if contribution is None:
+            return False
+        self._apply(contribution, -1)
+        return True
+
+    def update_from_export(self, path: str, force: bool = False) -> int:
+        """Make the table mirror ``path``: fold its rows in and drop products it no longer lists."""
+        source = os.path.abspath(path)
+        mtime = os.path.getmtime(source)
+        if not force and self.sources.get(source) == mtime:
+            return 0
+        seen = set()
+        changed = self.update(iter_rows(source), seen=seen)
+        for key in [key for key in self.products if key not in seen]:
+            self.remove(key)
+            changed += 1
+        # The table now reflects this export only.
+        self.sources = {source: mtime}
+        return changed
+
+    def is_stale(self, path: str) -> bool:
+        source = os.path.abspath(path)
+        return self.sources.get(source) != os.path.getmtime(source)
+
+    # -- queries ------------------------------------------------------------
+
+    def group(self, dimension: str, key: str = "*") -> dict:
+        return self.groups[dimension].get(key) or _empty_group()
+
+    def combined(self, dimension: str, keys: Iterable[str]) -> dict:
+        """Sum of several groups; only meaningful where groups do not overlap (creator, category, day)."""
+        total = _empty_group()
+        for key in keys:
+            group = self.groups[dimension].get(key)
+            if group is None:
+                continue
+            for field in ("products", "downloads", "revenue_usd", "rating_count", "rated", "rating_value_sum", "free"):
+                total[field] += group[field]
+            for index, count in enumerate(group["stars"]):
+                total["stars"][index] += count
+            for price, count in group["prices"].items():
+                total["prices"][price] = total["prices"].get(price, 0) + count
+        return total
+
+    @staticmethod
+    def price_quantiles(group: dict, quantiles=(0.25, 0.5, 0.75)) -> List[Optional[int]]:
+        histogram = sorted((int(price), count) for price, count in group["prices"].items())
+        total = sum(count for _, count in histogram)
+        if not total:
+            return [None for _ in quantiles]
+        results = []
+        for quantile in quantiles:
+            target = quantile * (total - 1)
+            seen = 0
+            for price, count in histogram:
+                seen += count
+                if seen > target:
+                    results.append(price)
+                    break
+        return results
+
+    @staticmethod
+    def average_rating(group: dict) -> Optional[float]:
+        return group["rating_value_sum"] / group["rated"] if group["rated"] else None
+
+    def top_products(self, limit: int = 10, by: str = "revenue_usd", creators=None) -> List[dict]:
+        creators = set(creators) if creators is not None else None
+        candidates = [
+            dict(contribution, key=key)
+            for key, contribution in self.products.items()
+            if creators is None or contribution["creator"] in creators
+        ]
+        candidates.sort(key=lambda contribution: contribution[by] or 0, reverse=True)
+        return candidates[:limit]
+
+    # -- persistence --------------------------------------------------------
+
+    def save(self, path: str):
+        payload = {
+            "version": ROLLUP_VERSION,
+            "sources": self.sources,
+            "groups": self.groups,
+            "products": self.products,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "RollupTable":
+        with open(path, encoding="utf-8") as handle:
+            payload = json.load(handle)
+        if payload.get("version") != ROLLUP_VERSION:
+            raise ValueError(f"Unsupported rollup table version in {path}")
+        table = cls()
+        table.sources = payload.get("sources", {})
+        table.groups.update(payload.get("groups", {}))
+        table.products = payload.get("products", {})
+        return table
+
+    @classmethod
+    def open(cls, path: str) -> "RollupTable":
+        return cls.load(path) if os.path.exists(path) else cls()
+
+
+def open_rollups(export_path: str, rollup_path: Optional[str] = None) -> RollupTable:
+    """Load the rollups for ``export_path`` and fold in the export if it changed."""
+    rollup_path = rollup_path or default_rollup_path(export_path)
+    table = RollupTable.open(rollup_path)
+    if table.is_stale(export_path):
+        table.update_from_export(export_path)
+        table.save(rollup_path)
+    return table
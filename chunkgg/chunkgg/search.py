@@ -0,0 +1,207 @@
+"""BM25 full-text index over crawl exports.
+
+The index is a plain JSON file kept next to the export it was built from.
+Each document stores its per-term frequencies so a product can be replaced
+in place when a newer snapshot changes its text; postings are rebuilt from
+those on load.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from chunkgg.snapshots import as_list, is_listing_row, iter_rows, row_key
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_NAME = "search_index.json"
+
+# Field weights scale term frequencies, so a title hit counts like three
+# description hits.
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "tags": 2.0,
+    "creator": 2.0,
+    "description": 1.0,
+    "changelog": 1.0,
+}
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from get in into is it its of on or the this to with your you".split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        # Cheap plural folding so "dragons" matches "dragon".
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def default_index_path(export_path: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(export_path)), DEFAULT_INDEX_NAME)
+
+
+class SearchIndex:
+    """Inverted index with BM25 ranking keyed on :func:`row_key`."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.docs: Dict[str, dict] = {}
+        self.sources: Dict[str, float] = {}
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._total_length = 0.0
+
+    # -- building -----------------------------------------------------------
+
+    @staticmethod
+    def _document_terms(row: dict) -> Counter:
+        terms: Counter = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            value = row.get(field)
+            if field == "tags":
+                value = " ".join(as_list(value))
+            for token in tokenize(value):
+                terms[token] += weight
+        return terms
+
+    @staticmethod
+    def _fingerprint(row: dict) -> str:
+        parts = []
+        for field in FIELD_WEIGHTS:
+            value = row.get(field)
+            if field == "tags":
+                value = ",".join(as_list(value))
+            parts.append(value or "")
+        return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def _add(self, key: str, fingerprint: str, terms: Dict[str, float]):
+        length = sum(terms.values())
+        self.docs[key] = {"fp": fingerprint, "len": length, "terms": dict(terms)}
+        self._total_length += length
+        for term, tf in terms.items():
+            self._postings[term][key] = tf
+
+    def remove(self, key: str) -> bool:
+        doc = self.docs.pop(key, None)
+        if doc is None:
+            return False
+        self._total_length -= doc["len"]
+        for term in doc["terms"]:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[term]
+        return True
+
+    def update(self, rows: Iterable[dict]) -> Tuple[int, int]:
+        """Add new products and re-index changed ones; returns ``(added, updated)``.
+
+        Partial listing rows only add products the index does not know yet.
+        """
+        added = updated = 0
+        for row in rows:
+            key = row_key(row)
+            if not key:
+                continue
+            current = self.docs.get(key)
+            if current is not None and is_listing_row(row):
+                # A listing card lacks the description and tags; keep the full document.
+                continue
+            fingerprint = self._fingerprint(row)
+            if current is not None:
+                if current["fp"] == fingerprint:
+                    continue
+                self.remove(key)
+                updated += 1
+            else:
+                added += 1
+            self._add(key, fingerprint, self._document_terms(row))
+        return added, updated
+
+    def update_from_export(self, path: str, force: bool = False) -> Tuple[int, int]:
+        """Fold a crawl export into the index unless it was already seen at this mtime."""
+        source = os.path.abspath(path)
+        mtime = os.path.getmtime(source)
+        if not force and self.sources.get(source) == mtime:
+            return 0, 0
+        result = self.update(iter_rows(source))
+        self.sources[source] = mtime
+        return result
+
+    def is_stale(self, path: str) -> bool:
+        source = os.path.abspath(path)
+        return self.sources.get(source) != os.path.getmtime(source)
+
+    # -- querying -----------------------------------------------------------
+
+    def search(self, query: str, limit: int = 50) -> List[Tuple[str, float]]:
+        terms = set(tokenize(query))
+        if not terms or not self.docs:
+            return []
+        total_docs = len(self.docs)
+        avg_length = self._total_length / total_docs or 1.0
+        scores: Dict[str, float] = defaultdict(float)
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1.0 + (total_docs - df + 0.5) / (df + 0.5))
+            for key, tf in postings.items():
+                norm = self.k1 * (1.0 - self.b + self.b * self.docs[key]["len"] / avg_length)
+                scores[key] += idf * tf * (self.k1 + 1.0) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda pair: pair[1], reverse=True)
+        return ranked[:limit]
+
+    # -- persistence --------------------------------------------------------
+
+    def save(self, path: str):
+        payload = {
+            "version": INDEX_VERSION,
+            "k1": self.k1,
+            "b": self.b,
+            "sources": self.sources,
+            "docs": self.docs,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "SearchIndex":
+        with open(path, encoding="utf-8") as handle:
+            payload = json.load(handle)
+        if payload.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported search index version in {path}")
+        index = cls(k1=payload.get("k1", 1.2), b=payload.get("b", 0.75))
+        index.sources = payload.get("sources", {})
+        for key, doc in payload.get("docs", {}).items():
+            index._add(key, doc["fp"], doc["terms"])
+        return index
+
+
+def open_index(export_path: str, index_path: Optional[str] = None) -> SearchIndex:
+    """Load the index for ``export_path`` and fold in the export if it changed."""
+    index_path = index_path or default_index_path(export_path)
+    index = SearchIndex.load(index_path) if os.path.exists(index_path) else SearchIndex()
+    if index.is_stale(export_path):
+        index.update_from_export(export_path)
+        index.save(index_path)
+    return index
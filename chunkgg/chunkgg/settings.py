@@ -11,6 +11,7 @@ BOT_NAME = "chunkgg"
 
 SPIDER_MODULES = ["chunkgg.spiders"]
 NEWSPIDER_MODULE = "chunkgg.spiders"
+COMMANDS_MODULE = "chunkgg.commands"
 
 ADDONS = {}
 
@@ -52,15 +53,30 @@ DOWNLOAD_DELAY = 1
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-#EXTENSIONS = {
-#    "scrapy.extensions.telnet.TelnetConsole": None,
-#}
+EXTENSIONS = {
+    "chunkgg.extensions.RunLedger": 500,
+}
+
+# One JSON line per crawl with timings, request/byte counts and per-category
+# item counts. `scrapy compareruns` checks the latest run against it.
+RUN_LEDGER_PATH = "runs.jl"
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-#ITEM_PIPELINES = {
-#    "chunkgg.pipelines.ChunkggPipeline": 300,
-#}
+ITEM_PIPELINES = {
+    "chunkgg.pipelines.TimeSeriesPipeline": 300,
+    "chunkgg.pipelines.GalleryMetadataPipeline": 400,
+    "chunkgg.pipelines.RollupPipeline": 500,
+    "chunkgg.pipelines.CompactItemExpansionPipeline": 900,
+}
+
+# Item fields to extract and export (list or comma-separated string); the
+# spider argument `-a fields=...` takes precedence. Empty means all fields.
+EXTRACT_FIELDS = []
+
+# Emit slotted CompactMarketplaceItem records from the spider. They are
+# expanded back to the full MarketplaceItem schema by the pipeline above.
+COMPACT_ITEMS = False
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
@@ -83,5 +99,42 @@ DOWNLOAD_DELAY = 1
 #HTTPCACHE_IGNORE_HTTP_CODES = []
 #HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
 
+# With `-a creators=1` the spider also emits CreatorItem records. Route them
+# to their own feed instead of using -O, for example:
+#FEEDS = {
+#    "products.csv": {"format": "csv", "item_classes": ["chunkgg.items.MarketplaceItem"], "overwrite": True},
+#    "creators.csv": {"format": "csv", "item_classes": ["chunkgg.items.CreatorItem"], "overwrite": True},
+#}
+
 # Set settings whose default value is deprecated to a future-proof value
 FEED_EXPORT_ENCODING = "utf-8"
+
+# Full-text search index maintained by `scrapy searchindex`. Leave unset to
+# keep the index next to the export it was built from.
+SEARCH_INDEX_PATH = None
+
+# Per-product history of ratings, prices and trailer stats, appended on every
+# crawl by TimeSeriesPipeline. Set to an empty value to disable recording.
+TIMESERIES_PATH = "timeseries.json.gz"
+
+# Dashboard aggregates (per creator, category, tag and launch day) kept up to
+# date by RollupPipeline. Set to an empty value to disable.
+ROLLUP_PATH = "rollups.json"
+
+# Local read-only JSON API (`scrapy serveapi`). The export is reloaded when
+# its modification time changes; keep the host on loopback.
+API_EXPORT_PATH = "products.csv"
+API_HOST = "127.0.0.1"
+API_PORT = 8765
+API_POLL_INTERVAL = 2.0
+
+# Optional gallery image metadata stage (GalleryMetadataPipeline). Reads only
+# the image headers unless GALLERY_PHASH is on, which downloads whole images
+# and needs Pillow. Results are cached by URL/ETag across runs.
+GALLERY_METADATA_ENABLED = False
+GALLERY_PHASH = False
+GALLERY_CACHE_PATH = "gallery_cache.json"
+GALLERY_CONCURRENCY = 4
+GALLERY_RANGE_BYTES = 65536
+GALLERY_WORKERS = 2
+GALLERY_REVALIDATE = False
@@ -0,0 +1,83 @@
+"""Readers for crawl exports written by the feed exporters (CSV or JSON Lines)."""
+
+import csv
+import json
+import os
+from typing import Iterator, Optional
+
+# Multi-valued fields the CSV exporter flattens with ",".
+LIST_FIELDS = ("tags", "gallery", "features", "platforms")
+
+
+def iter_rows(path: str) -> Iterator[dict]:
+    """Yield one dict per product from a ``.csv`` or ``.jl``/``.jsonl`` export.
+
+    Empty CSV cells become ``None`` and list fields are split back into lists,
+    so both formats come out with the same shape.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".jl", ".jsonl"):
+        with open(path, encoding="utf-8-sig") as handle:
+            for line in handle:
+                # utf-8-sig feeds prefix every line with a BOM, not just the first.
+                line = line.strip().lstrip("\ufeff")
+                if line:
+                    yield json.loads(line)
+        return
+
+    with open(path, encoding="utf-8-sig", newline="") as handle:
+        for raw in csv.DictReader(handle):
+            row = {}
+            for key, value in raw.items():
+                if key is None:
+                    continue
+                if value is None or value == "":
+                    # Short rows get None from DictReader for the missing cells.
+                    value = None
+                elif key in LIST_FIELDS:
+                    value = [part.strip() for part in value.split(",") if part.strip()]
+                row[key] = value
+            yield row
+
+
+def row_key(row: dict) -> Optional[str]:
+    """Stable product identifier: the marketplace UUID, else the product URL."""
+    for field in ("uuid", "uid", "product_url", "url"):
+        value = row.get(field)
+        if value:
+            return str(value)
+    return None
+
+
+def as_list(value) -> list:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value if v]
+    return [part.strip() for part in str(value).split(",") if part.strip()]
+
+
+def to_int(value) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def to_float(value) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_listing_row(row: dict) -> bool:
+    """True for partial rows built from listing cards (``mode=listing``)."""
+    value = row.get("listing_only")
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1")
+    return bool(value)
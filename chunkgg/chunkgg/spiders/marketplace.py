@@ -1,12 +1,17 @@
 import html
 import json
 import re
-from typing import List, Optional, Tuple
+import time
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
 import scrapy
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider
 
-from chunkgg.items import MarketplaceItem
+from chunkgg.creators import CreatorStats
+from chunkgg.items import RATING_STARS, CompactMarketplaceItem, MarketplaceItem, split_product_path
+from chunkgg.timeseries import TimeSeriesStore
 
 
 CATEGORY_ORDER = [
@@ -18,6 +23,52 @@ CATEGORY_ORDER = [
 ]
 CATEGORY_PATHS = {path: label for path, label in CATEGORY_ORDER}
 
+# Extraction steps run by parse_product, in page order, with the fields each
+# one fills. With a field selection only the steps producing those fields run.
+EXTRACTION_STEPS = [
+    ("title", frozenset({"title"})),
+    ("creator", frozenset({"creator", "creator_url"})),
+    ("description", frozenset({"description"})),
+    ("tags", frozenset({"tags"})),
+    ("price", frozenset({"price_minecoins", "is_free"})),
+    ("price_conversions", frozenset({"price_usd", "price_eur"})),
+    ("rating", frozenset({"rating_value", "rating_count", "rating_out_of"})),
+    (
+        "rating_breakdown",
+        frozenset(
+            {"rating_breakdown"}
+            | {f"rating_{star}_{kind}" for star in RATING_STARS for kind in ("count", "percent")}
+        ),
+    ),
+    ("downloads", frozenset({"downloads"})),
+    ("details", frozenset({"min_version", "launched", "launched_iso", "last_updated", "last_updated_iso"})),
+    ("changelog", frozenset({"changelog"})),
+    ("uuid", frozenset({"uuid"})),
+    (
+        "badges",
+        frozenset(
+            {
+                "skin_count",
+                "player_range",
+                "badge_labels",
+                "badge_modifiers",
+                "supports_singleplayer",
+                "supports_multiplayer",
+            }
+        ),
+    ),
+    ("trailer", frozenset({"has_trailer", "trailer_url", "trailer_views", "trailer_likes"})),
+    ("gallery", frozenset({"gallery"})),
+]
+
+# Product fields CreatorStats aggregates; their steps run whenever the creator
+# stage is on, even if a field selection leaves them out of the export.
+CREATOR_STAT_FIELDS = frozenset({"creator", "creator_url", "price_minecoins", "rating_value", "rating_count"})
+
+# "full" parses every product page; "listing" builds items from the category
+# cards and only follows products that are new or whose card values changed.
+MODES = ("full", "listing")
+
 
 class ChunkMarketplaceSpider(scrapy.Spider):
     """Scrapes chunk.gg category listings and product detail pages."""
@@ -32,11 +83,55 @@ class ChunkMarketplaceSpider(scrapy.Spider):
         "FEED_EXPORT_ENCODING": "utf-8-sig",
     }
 
-    def __init__(self, max_pages: int = 50, categories: Optional[str] = None, **kwargs):
+    def __init__(
+        self,
+        max_pages: int = 50,
+        categories: Optional[str] = None,
+        mode: str = "full",
+        fields: Optional[str] = None,
+        creators: str = "0",
+        creator_products: str = "0",
+        **kwargs,
+    ):
         super().__init__(**kwargs)
         self.max_pages = int(max_pages)
+        self.mode = str(mode).strip().lower()
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}'. Accepted values: {', '.join(MODES)}")
         self._seen_products = set()
         self._selected_paths = self._resolve_categories(categories)
+        self._snapshots: Optional[TimeSeriesStore] = None
+        self.fields = self._resolve_fields(fields) if fields else None
+        self._plan = None
+        self.crawl_creators = str(creators).strip().lower() in ("1", "true", "yes", "on")
+        self.follow_creator_products = str(creator_products).strip().lower() in ("1", "true", "yes", "on")
+        self._creators: Dict[str, CreatorStats] = {}
+        self._requested_creators = set()
+        self._creator_flush_scheduled = False
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider.spider_idle, signal=signals.spider_idle)
+        settings = crawler.settings
+        if spider.fields is None and settings.get("EXTRACT_FIELDS"):
+            spider.fields = spider._resolve_fields(settings.getlist("EXTRACT_FIELDS"))
+        if spider.fields is not None:
+            # Settings are still writable here; feed exporters read them later.
+            crawler.settings.set("FEED_EXPORT_FIELDS", spider._export_fields(settings), priority="spider")
+        return spider
+
+    @property
+    def run_config(self) -> dict:
+        """Spider arguments that shape a run; recorded in the run ledger."""
+        return {
+            "max_pages": self.max_pages,
+            "mode": self.mode,
+            "categories": [CATEGORY_PATHS[path] for path in self._selected_paths],
+            "fields": self.fields,
+            "creators": self.crawl_creators,
+            "creator_products": self.follow_creator_products,
+        }
 
     def _resolve_categories(self, categories: Optional[str]) -> List[str]:
         if not categories:
@@ -62,7 +157,34 @@ class ChunkMarketplaceSpider(scrapy.Spider):
             raise ValueError(f"No valid categories found in '{categories}'. Accepted values: {valid}")
         return selected
 
+    def _resolve_fields(self, fields) -> List[str]:
+        if isinstance(fields, str):
+            fields = fields.split(",")
+        requested = list(dict.fromkeys(token.strip() for token in fields if token and token.strip()))
+        unknown = [field for field in requested if field not in MarketplaceItem.fields]
+        if unknown or not requested:
+            raise ValueError(
+                f"Unknown item fields: {', '.join(unknown) or '(none given)'}. "
+                f"Accepted values: {', '.join(MarketplaceItem.fields)}"
+            )
+        return requested
+
+    def _export_fields(self, settings) -> List[str]:
+        """Feed columns for a field selection, including the ones pipelines and listing mode add."""
+        columns = list(self.fields)
+        if "gallery" in columns and settings.getbool("GALLERY_METADATA_ENABLED"):
+            columns.append("gallery_meta")
+        if self.mode == "listing":
+            columns.append("listing_only")
+        return columns
+
     def start_requests(self):
+        if self.mode == "listing":
+            path = self.settings.get("TIMESERIES_PATH")
+            if not path:
+                self.logger.warning("TIMESERIES_PATH is not set; every listed product will be followed")
+            self._snapshots = TimeSeriesStore.open(path) if path else TimeSeriesStore()
+
         base = "https://chunk.gg"
         for path in self._selected_paths:
             label = CATEGORY_PATHS[path]
@@ -79,6 +201,14 @@ class ChunkMarketplaceSpider(scrapy.Spider):
             if not href or href in self._seen_products:
                 continue
             self._seen_products.add(href)
+            if self.mode == "listing":
+                card = self._extract_card(response, anchor, category)
+                if not self._card_changed(card):
+                    self.crawler.stats.inc_value("chunkgg/listing/unchanged")
+                    yield self._finalize_item(card)
+                    yield from self._track_creator(card)
+                    continue
+                self.crawler.stats.inc_value("chunkgg/listing/followed")
             yield response.follow(
                 href,
                 callback=self.parse_product,
@@ -98,32 +228,235 @@ class ChunkMarketplaceSpider(scrapy.Spider):
                 priority=0,
             )
 
+    def _extract_card(self, response, anchor, category: str) -> MarketplaceItem:
+        """Partial item from a ``section.product-grid`` card (no detail-page fields)."""
+        item = MarketplaceItem()
+        item["product_url"] = response.urljoin(anchor.attrib["href"])
+        slug_path = urlparse(item["product_url"]).path
+        item["slug"] = slug_path
+        item["category"] = category
+        item["listing_only"] = True
+
+        creator_slug, product_slug = split_product_path(slug_path)
+        if creator_slug:
+            item["creator_slug"] = creator_slug
+        if product_slug:
+            item["product_slug"] = product_slug
+
+        title = (
+            anchor.css("[class*='title']::text").get()
+            or anchor.attrib.get("title")
+            or anchor.css("img::attr(alt)").get()
+        )
+        item["title"] = self._clean_text(title)
+
+        creator = anchor.css("[class*='creator'] ::text, [class*='author'] ::text").get()
+        item["creator"] = self._clean_text(creator)
+
+        price_texts = anchor.css("[class*='price'] ::text").getall() or anchor.css("label-text::text").getall()
+        price_text = " ".join(text.strip() for text in price_texts if text and text.strip())
+        if re.search(r"\bfree\b", price_text, flags=re.I):
+            item["price_minecoins"] = 0
+        else:
+            match = re.search(r"[0-9][0-9,.]*", price_text)
+            item["price_minecoins"] = self._to_int(match.group(0)) if match else None
+        item["is_free"] = (
+            item["price_minecoins"] == 0 if item["price_minecoins"] is not None else None
+        )
+
+        # Prefer microdata; otherwise the count is the parenthesised number and
+        # the value a standalone 0-5 number outside the parentheses.
+        rating_text = " ".join(anchor.css("[class*='rating'] ::text").getall())
+        value_text = anchor.css("[itemprop='ratingValue']::attr(content), [itemprop='ratingValue']::text").get()
+        if value_text is None:
+            outside = re.sub(r"\([^)]*\)", " ", rating_text)
+            value_match = re.search(r"(?<![0-9.,])([0-5](?:\.[0-9]+)?)(?![0-9.,])", outside)
+            value_text = value_match.group(1) if value_match else None
+        if value_text:
+            item["rating_value"] = self._to_float(value_text)
+        count_text = anchor.css("[itemprop='ratingCount']::attr(content), [itemprop='ratingCount']::text").get()
+        if count_text is None:
+            count_match = re.search(r"\(([0-9][0-9,.]*)\)", rating_text)
+            count_text = count_match.group(1) if count_match else None
+        if count_text:
+            item["rating_count"] = self._to_int(count_text)
+
+        badges = [
+            self._clean_text(text)
+            for text in anchor.css(".label-box__paragraph::text").getall()
+            if text and text.strip()
+        ]
+        if badges:
+            item["badge_labels"] = " | ".join(dict.fromkeys(badges))
+        return item
+
+    def _card_changed(self, card: MarketplaceItem) -> bool:
+        """True when the product is unknown or a card value differs from the stored snapshot."""
+        uuid = self._snapshots.uuid_for_slug(card["slug"])
+        last = self._snapshots.latest(uuid) if uuid else None
+        if last is None:
+            return True
+
+        compared = False
+        for field in ("price_minecoins", "rating_value", "rating_count"):
+            value = card.get(field)
+            if value is None:
+                continue
+            compared = True
+            previous = last.get(field)
+            if previous is None:
+                return True
+            if field == "rating_value":
+                # Cards may round to one decimal.
+                if abs(value - previous) > 0.05:
+                    return True
+            elif value != previous:
+                return True
+        if not compared:
+            # Nothing readable on the card; fall back to the detail page.
+            return True
+
+        card["uuid"] = uuid
+        return False
+
     def parse_product(self, response, category: str):
+        started = time.perf_counter()
         item = MarketplaceItem()
         item["product_url"] = response.url
         slug_path = urlparse(response.url).path
         item["slug"] = slug_path
         item["category"] = category
 
-        product_slug = None
-        creator_slug = None
-        if slug_path:
-            parts = slug_path.strip("/").split("/")
-            if parts:
-                handle = parts[0]
-                if handle.startswith("@"):
-                    handle = handle[1:]
-                creator_slug = handle or None
-            if len(parts) >= 2:
-                product_slug = parts[-1] or None
+        creator_slug, product_slug = split_product_path(slug_path)
         if creator_slug:
             item["creator_slug"] = creator_slug
         if product_slug:
             item["product_slug"] = product_slug
 
+        for step in self._extraction_plan():
+            step(response, item)
+
+        self.crawler.stats.inc_value("chunkgg/parse_product_seconds", time.perf_counter() - started)
+        self.crawler.stats.inc_value("chunkgg/parse_product_count")
+        yield self._finalize_item(item)
+        yield from self._track_creator(item)
+
+    def parse_creator(self, response, creator_slug: str):
+        """Record a creator's catalogue; with ``creator_products`` also queue products the listings missed."""
+        stats = self._creators[creator_slug]
+        for anchor in response.css(f"a[href^='/@{creator_slug}/']"):
+            href = anchor.attrib.get("href", "").split("?")[0].split("#")[0]
+            if not split_product_path(href)[1]:
+                continue
+            stats.listed.add(href)
+            if not self.follow_creator_products or href in self._seen_products:
+                continue
+            self._seen_products.add(href)
+            self.crawler.stats.inc_value("chunkgg/creators/discovered_products")
+            yield response.follow(
+                href,
+                callback=self.parse_product,
+                cb_kwargs={"category": None},
+                priority=10,
+            )
+
+        next_href = response.css(".pagination a[rel='next']::attr(href)").get()
+        if next_href:
+            yield response.follow(
+                next_href,
+                callback=self.parse_creator,
+                cb_kwargs={"creator_slug": creator_slug},
+                priority=5,
+            )
+            return
+        stats.listing_done = True
+        yield from self._emit_creator(stats)
+
+    def _track_creator(self, item: MarketplaceItem):
+        """Fold a product into its creator's aggregates; request the creator page once per run."""
+        if not self.crawl_creators:
+            return
+        slug = item.get("creator_slug")
+        if not slug:
+            return
+        stats = self._creators.get(slug)
+        if stats is None:
+            stats = self._creators[slug] = CreatorStats(slug)
+        stats.add(item)
+        if slug not in self._requested_creators:
+            self._requested_creators.add(slug)
+            self.crawler.stats.inc_value("chunkgg/creators/requested")
+            yield scrapy.Request(
+                f"https://chunk.gg/@{slug}",
+                callback=self.parse_creator,
+                cb_kwargs={"creator_slug": slug},
+                priority=5,
+            )
+        yield from self._emit_creator(stats)
+
+    def _emit_creator(self, stats: CreatorStats, force: bool = False):
+        # One CreatorItem per creator: on completion, or from the idle flush.
+        # Without creator_products part of the catalogue is never parsed, so
+        # the aggregates are final only once the crawl runs dry.
+        if stats.emitted:
+            return
+        if force or (self.follow_creator_products and stats.complete):
+            stats.emitted = True
+            yield stats.to_item()
+
+    def spider_idle(self):
+        """Flush creators whose listings never fully resolved before the spider closes."""
+        if not self.crawl_creators or self._creator_flush_scheduled:
+            return
+        if all(stats.emitted for stats in self._creators.values()):
+            return
+        self._creator_flush_scheduled = True
+        request = scrapy.Request(
+            "data:,",
+            callback=self._flush_creators,
+            dont_filter=True,
+            meta={"allow_offsite": True},
+        )
+        self.crawler.engine.crawl(request)
+        raise DontCloseSpider
+
+    def _flush_creators(self, response):
+        self._creator_flush_scheduled = False
+        for stats in self._creators.values():
+            yield from self._emit_creator(stats, force=True)
+
+    def _extraction_plan(self) -> list:
+        """Bound ``_fill_*`` steps needed for the selected fields, in page order."""
+        if self._plan is None:
+            needed = None
+            if self.fields is not None:
+                needed = set(self.fields)
+                if self.crawl_creators:
+                    needed |= CREATOR_STAT_FIELDS
+            self._plan = [
+                getattr(self, f"_fill_{step}")
+                for step, produced in EXTRACTION_STEPS
+                if needed is None or produced.intersection(needed)
+            ]
+        return self._plan
+
+    def _finalize_item(self, item: MarketplaceItem):
+        if self.fields is not None:
+            # Plain dict holding only the selected columns; FEED_EXPORT_FIELDS
+            # fixes the header so it does not depend on the first item's keys.
+            narrowed = {field: item.get(field) for field in self.fields}
+            if self.mode == "listing":
+                narrowed["listing_only"] = item.get("listing_only")
+            return narrowed
+        if self.settings.getbool("COMPACT_ITEMS") and not item.get("listing_only"):
+            return CompactMarketplaceItem.from_item(item)
+        return item
+
+    def _fill_title(self, response, item: MarketplaceItem):
         title = response.css("h1.product-title::text").get()
         item["title"] = title.strip() if title else None
 
+    def _fill_creator(self, response, item: MarketplaceItem):
         creator = response.xpath("//a[@rel='author']//text()[normalize-space()]").get()
         item["creator"] = creator.strip() if creator else None
 
@@ -131,21 +464,25 @@ class ChunkMarketplaceSpider(scrapy.Spider):
         if creator_url:
             item["creator_url"] = response.urljoin(creator_url)
 
+    def _fill_description(self, response, item: MarketplaceItem):
         description = response.css("meta[name='description']::attr(content)").get()
         item["description"] = self._clean_text(description)
 
+    def _fill_tags(self, response, item: MarketplaceItem):
         item["tags"] = self._extract_tags(response)
 
+    def _fill_price(self, response, item: MarketplaceItem):
         price_text = response.css(".product-intro__details label-text::text").get()
         item["price_minecoins"] = self._to_int(price_text)
         item["is_free"] = (
             item["price_minecoins"] == 0 if item["price_minecoins"] is not None else None
         )
 
+    def _fill_price_conversions(self, response, item: MarketplaceItem):
         item["price_usd"] = self._extract_price_usd(response)
         item["price_eur"] = self._extract_price_eur(response)
-        item["has_trailer"] = False
 
+    def _fill_rating(self, response, item: MarketplaceItem):
         rating_value = self._to_float(response.css(".rating__count p::text").get())
         if rating_value is not None:
             item["rating_value"] = rating_value
@@ -160,13 +497,16 @@ class ChunkMarketplaceSpider(scrapy.Spider):
         if rating_fraction is not None and "rating_value" not in item:
             item["rating_value"] = self._to_float(rating_fraction.split("/")[0])
 
+    def _fill_rating_breakdown(self, response, item: MarketplaceItem):
         rating_breakdown = self._extract_rating_breakdown(response)
         if rating_breakdown:
             self._apply_rating_breakdown(item, rating_breakdown)
             item["rating_breakdown"] = json.dumps(rating_breakdown, ensure_ascii=False)
 
+    def _fill_downloads(self, response, item: MarketplaceItem):
         item["downloads"] = self._extract_downloads(response)
 
+    def _fill_details(self, response, item: MarketplaceItem):
         details = self._extract_product_details(response)
         for key, value in details.items():
             if isinstance(value, str):
@@ -174,14 +514,17 @@ class ChunkMarketplaceSpider(scrapy.Spider):
             if value is not None:
                 item[key] = value
 
+    def _fill_changelog(self, response, item: MarketplaceItem):
         changelog = self._extract_changelog(response)
         if changelog:
             item["changelog"] = changelog
 
+    def _fill_uuid(self, response, item: MarketplaceItem):
         uuid = self._extract_uuid(response)
         if uuid:
             item["uuid"] = uuid
 
+    def _fill_badges(self, response, item: MarketplaceItem):
         badge_info = self._extract_badges(response)
         badge_labels_list = badge_info.get("badge_labels", [])
         badge_modifiers_list = badge_info.get("badge_modifiers", [])
@@ -204,14 +547,15 @@ class ChunkMarketplaceSpider(scrapy.Spider):
         if supports_multi is not None:
             item["supports_multiplayer"] = supports_multi
 
+    def _fill_trailer(self, response, item: MarketplaceItem):
+        item["has_trailer"] = False
         trailer_info = self._extract_trailer_info(response)
         if trailer_info:
             for key, value in trailer_info.items():
                 item[key] = value
 
-        item["gallery"] = self._extract_gallery(response, slug_path)
-
-        yield item
+    def _fill_gallery(self, response, item: MarketplaceItem):
+        item["gallery"] = self._extract_gallery(response, item["slug"])
 
     def _extract_tags(self, response) -> Optional[List[str]]:
         tags: List[str] = []
@@ -0,0 +1,278 @@
+"""Per-product time series of crawl metrics, keyed by marketplace UUID.
+
+Every series shares one timestamp column per product, stored as a start
+value plus deltas. Each metric is a list of ``[delta, run_length]`` runs:
+``delta`` is the change from the previous non-empty value (``None`` for a
+missing reading) and ``run_length`` counts consecutive crawls that saw the
+same value, so a product whose numbers did not move costs one increment per
+crawl. Floats are kept as scaled integers to keep the deltas exact.
+"""
+
+import bisect
+import gzip
+import json
+import os
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from chunkgg.items import RATING_STARS
+
+STORE_VERSION = 1
+DAY_SECONDS = 86400
+
+# metric name -> integer scale applied before encoding
+METRICS: Dict[str, int] = {
+    "rating_count": 1,
+    "rating_value": 100,
+    **{f"rating_{star}_count": 1 for star in RATING_STARS},
+    "price_minecoins": 1,
+    "trailer_views": 1,
+    "trailer_likes": 1,
+}
+
+
+def _encode(metric: str, value) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    try:
+        return int(round(float(value) * METRICS[metric]))
+    except (TypeError, ValueError):
+        return None
+
+
+def _decode(metric: str, value: Optional[int]):
+    if value is None:
+        return None
+    scale = METRICS[metric]
+    return value / scale if scale != 1 else value
+
+
+class _Series:
+    __slots__ = ("start", "deltas", "last_time", "runs", "tail", "base")
+
+    def __init__(self):
+        self.start: Optional[int] = None
+        self.deltas: List[int] = []
+        self.last_time: Optional[int] = None
+        self.runs: Dict[str, List[list]] = {}
+        # last encoded value per metric (None included) and last non-empty one
+        self.tail: Dict[str, Optional[int]] = {}
+        self.base: Dict[str, int] = {}
+
+    def __len__(self):
+        return 0 if self.start is None else len(self.deltas) + 1
+
+    def append(self, timestamp: int, values: Dict[str, Optional[int]]) -> bool:
+        if self.last_time is not None and timestamp <= self.last_time:
+            return False
+        points = len(self)
+        if self.start is None:
+            self.start = timestamp
+        else:
+            self.deltas.append(timestamp - self.last_time)
+        self.last_time = timestamp
+
+        for metric in METRICS:
+            value = values.get(metric)
+            runs = self.runs.get(metric)
+            if runs is None:
+                runs = self.runs[metric] = []
+                if points:
+                    runs.append([None, points])
+            if runs and metric in self.tail and self.tail[metric] == value:
+                runs[-1][1] += 1
+                continue
+            if value is None:
+                runs.append([None, 1])
+            else:
+                runs.append([value - self.base.get(metric, 0), 1])
+                self.base[metric] = value
+            self.tail[metric] = value
+        return True
+
+    def times(self) -> List[int]:
+        if self.start is None:
+            return []
+        return list(accumulate(self.deltas, initial=self.start))
+
+    def values(self, metric: str) -> List[Optional[int]]:
+        out: List[Optional[int]] = []
+        current = 0
+        for delta, length in self.runs.get(metric, [[None, len(self)]]):
+            if delta is None:
+                out.extend([None] * length)
+            else:
+                current += delta
+                out.extend([current] * length)
+        return out
+
+    def to_json(self) -> dict:
+        return {
+            "start": self.start,
+            "deltas": self.deltas,
+            "runs": self.runs,
+            "tail": self.tail,
+            "base": self.base,
+        }
+
+    @classmethod
+    def from_json(cls, payload: dict) -> "_Series":
+        series = cls()
+        series.start = payload["start"]
+        series.deltas = payload["deltas"]
+        series.runs = payload["runs"]
+        series.tail = payload["tail"]
+        series.base = payload["base"]
+        if series.start is not None:
+            series.last_time = series.start + sum(series.deltas)
+        return series
+
+
+class TimeSeriesStore:
+    """Delta/run-length encoded crawl history with range and downsampling queries."""
+
+    def __init__(self):
+        self.series: Dict[str, _Series] = {}
+        self.slugs: Dict[str, str] = {}
+
+    def record(
+        self,
+        uuid: str,
+        timestamp: int,
+        values: dict,
+        slug: Optional[str] = None,
+        carry_forward: bool = False,
+    ) -> bool:
+        """Append one crawl observation; older or duplicate timestamps are ignored.
+
+        With ``carry_forward`` metrics missing from ``values`` repeat their last
+        reading instead of being recorded as empty (partial listing items).
+        """
+        if slug:
+            self.slugs[slug] = uuid
+        series = self.series.get(uuid)
+        if series is None:
+            series = self.series[uuid] = _Series()
+        encoded = {}
+        for metric in METRICS:
+            if carry_forward and metric not in values:
+                encoded[metric] = series.tail.get(metric)
+            else:
+                encoded[metric] = _encode(metric, values.get(metric))
+        return series.append(int(timestamp), encoded)
+
+    def uuid_for_slug(self, slug: str) -> Optional[str]:
+        return self.slugs.get(slug)
+
+    def latest(self, uuid: str) -> Optional[dict]:
+        series = self.series.get(uuid)
+        if series is None or not len(series):
+            return None
+        snapshot = {metric: _decode(metric, series.tail.get(metric)) for metric in METRICS}
+        snapshot["timestamp"] = series.last_time
+        return snapshot
+
+    def range(
+        self,
+        uuid: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        metrics: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[int, dict]]:
+        """Observations with ``start <= timestamp <= end`` as ``(timestamp, values)``."""
+        series = self.series.get(uuid)
+        if series is None:
+            return []
+        times = series.times()
+        lo = 0 if start is None else bisect.bisect_left(times, start)
+        hi = len(times) if end is None else bisect.bisect_right(times, end)
+        if lo >= hi:
+            return []
+        columns = {
+            metric: series.values(metric)[lo:hi] for metric in (metrics or METRICS)
+        }
+        points = []
+        for offset, timestamp in enumerate(times[lo:hi]):
+            points.append(
+                (timestamp, {metric: _decode(metric, column[offset]) for metric, column in columns.items()})
+            )
+        return points
+
+    def downsample(
+        self,
+        uuid: str,
+        metric: str,
+        bucket_seconds: int = DAY_SECONDS,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> List[Tuple[int, object]]:
+        """Last non-empty value of ``metric`` per ``bucket_seconds`` bucket."""
+        buckets: Dict[int, object] = {}
+        for timestamp, values in self.range(uuid, start, end, metrics=(metric,)):
+            value = values[metric]
+            if value is not None:
+                buckets[timestamp - timestamp % bucket_seconds] = value
+        return sorted(buckets.items())
+
+    def velocity(
+        self,
+        uuid: str,
+        metric: str = "rating_count",
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> Optional[float]:
+        """Average change of ``metric`` per day between the first and last reading."""
+        readings = [
+            (timestamp, values[metric])
+            for timestamp, values in self.range(uuid, start, end, metrics=(metric,))
+            if values[metric] is not None
+        ]
+        if len(readings) < 2:
+            return None
+        (first_time, first_value), (last_time, last_value) = readings[0], readings[-1]
+        if last_time == first_time:
+            return None
+        return (last_value - first_value) * DAY_SECONDS / (last_time - first_time)
+
+    def top_velocity(
+        self,
+        limit: int = 10,
+        metric: str = "rating_count",
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> List[Tuple[str, float]]:
+        ranked = []
+        for uuid in self.series:
+            rate = self.velocity(uuid, metric, start, end)
+            if rate is not None:
+                ranked.append((uuid, rate))
+        ranked.sort(key=lambda pair: pair[1], reverse=True)
+        return ranked[:limit]
+
+    def save(self, path: str):
+        payload = {
+            "version": STORE_VERSION,
+            "metrics": METRICS,
+            "slugs": self.slugs,
+            "series": {uuid: series.to_json() for uuid, series in self.series.items()},
+        }
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as handle:
+            json.dump(payload, handle, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "TimeSeriesStore":
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            payload = json.load(handle)
+        if payload.get("version") != STORE_VERSION or payload.get("metrics") != METRICS:
+            raise ValueError(f"Unsupported time-series store layout in {path}")
+        store = cls()
+        store.slugs = payload.get("slugs", {})
+        for uuid, series in payload.get("series", {}).items():
+            store.series[uuid] = _Series.from_json(series)
+        return store
+
+    @classmethod
+    def open(cls, path: str) -> "TimeSeriesStore":
+        return cls.load(path) if os.path.exists(path) else cls()